@@ -0,0 +1,640 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import diagnostics
+
+# Dimensions of the shared student count cube
+CUBE_DIMENSIONS = ['Year', 'Course', 'Date', 'Cat', 'Adm Type', 'Status']
+
+# Set SMP_CHECK_AGGREGATES=1 to compare every incrementally updated count cube with a full rebuild
+CHECK_AGGREGATES = os.environ.get('SMP_CHECK_AGGREGATES') == '1'
+
+# Student views offered by the dashboard and the row statuses (see data_loader.STATUSES) each one counts
+STATUS_VIEWS = {
+    'Admitted': ['Admitted'],
+    'Due Fee': ['Due Fee'],
+    'Out': ['Out'],
+    'All': None,
+}
+
+# Columns of the Student List, in display order
+STUDENT_LIST_COLUMNS = ['Student Name', 'Father Name', 'Year', 'Course', 'Admn Year', 'Cat', 'Date']
+
+# Columns the Student List can be filtered on
+FILTER_COLUMNS = ['Year', 'Course', 'Cat', 'Adm Type', 'Adm Cat', 'Acdmc Year', 'Status']
+
+# Columns the student search matches, and the columns of its results
+SEARCH_COLUMNS = ['Student Name', 'Father Name', 'Reg No', 'Rpt']
+SEARCH_RESULT_COLUMNS = ['Student Name', 'Father Name', 'Reg No', 'Rpt', 'Year', 'Course', 'Date', 'Status']
+
+# Shortest query searched, share of its trigrams a value must contain, and most results returned
+SEARCH_MIN_CHARS = 2
+SEARCH_MIN_SCORE = 0.5
+SEARCH_LIMIT = 50
+# Runs of anything but letters and digits; search treats each as one space
+SEARCH_SEPARATORS = re.compile(r'[\W_]+')
+
+# Columns derived at load time, which the plain roster measured by the memory report didn't have
+MEMORY_REPORT_DERIVED_COLUMNS = ['Status']
+
+# Display format of admission dates
+DATE_LABEL_FORMAT = '%d-%b-%y'
+
+# Time series intervals as resample rules; weeks run Monday to Sunday and are labelled by their Monday
+TIME_SERIES_RULES = {
+    'Daily': 'D',
+    'Weekly': 'W-MON',
+    'Monthly': 'MS',
+}
+ROLLING_DAYS = 7
+
+# The date-wise chart shows at most this many bar groups; longer spans are binned by week, then by month
+MAX_CHART_PERIODS = 60
+CHART_BINS = [
+    ('Daily', 'D', DATE_LABEL_FORMAT),
+    ('Weekly', 'W', 'Wk %d-%b-%y'),
+    ('Monthly', 'M', '%b-%y'),
+]
+
+def slice_academic_year(df, year):
+    """Return one academic year of the combined roster"""
+    # Partitions are contiguous row ranges, so a year is a slice rather than a filter
+    start, stop = df.attrs['partitions'][year]
+    year_df = df.iloc[start:stop]
+    year_df.attrs = {**df.attrs, 'version': f"{df.attrs['version']}:{year}", 'row_range': (start, stop)}
+    return year_df
+
+def build_memory_report(df):
+    """Bytes per column of the roster as plain text columns vs the compact schema"""
+    # Before compaction text was held as Python strings, integers as Int64 and every date also as a
+    # formatted string; the derived Status column didn't exist
+    plain = df.drop(columns=[col for col in MEMORY_REPORT_DERIVED_COLUMNS if col in df.columns])
+    plain = plain.astype({
+        col: object if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype) else 'Int64'
+        for col, dtype in plain.dtypes.items()
+        if isinstance(dtype, (pd.CategoricalDtype, pd.Int8Dtype, pd.Int16Dtype, pd.Int32Dtype))
+        or pd.api.types.is_string_dtype(dtype)
+    })
+    before = plain.memory_usage(index=False, deep=True)
+    if 'Date' in df.columns:
+        before['Formatted_Date'] = df['Date'].dt.strftime(DATE_LABEL_FORMAT).astype(object).memory_usage(index=False, deep=True)
+    after = df.memory_usage(index=False, deep=True)
+
+    report = pd.DataFrame({
+        'Type': df.dtypes.astype(str),
+        'Before': before,
+        'After': after
+    }).reindex(before.index.union(after.index, sort=False)).fillna({'Type': '-', 'Before': 0, 'After': 0})
+    report.loc['Total'] = ['', report['Before'].sum(), report['After'].sum()]
+    report[['Before', 'After']] = report[['Before', 'After']].astype('int64')
+    return report
+
+def build_count_cube(df):
+    """Count students for every Year x Course x Date x Cat x Adm Type combination
+
+    Every card, table and chart rolls the cube up with rollup_cube instead
+    of rescanning the roster rows.
+    """
+    dims = [col for col in CUBE_DIMENSIONS if col in df.columns]
+    # Keep missing values as their own cells so the cube total always equals the row count
+    cube = df.groupby(dims, observed=True, dropna=False).size().reset_index(name='Students')
+
+    # Ordered by date (missing dates last) so date ranges can be located by binary search
+    if 'Date' in cube.columns:
+        cube = cube.sort_values('Date', kind='stable', na_position='last', ignore_index=True)
+    return cube
+
+def get_appended_rows(df, base_version):
+    """Rows of df appended since the roster version base_version, or None
+
+    None means the roster changed in some other way (or base_version is from
+    another academic year), so aggregates have to be rebuilt from every row.
+    """
+    delta = df.attrs.get('delta')
+    if delta is None or base_version is None:
+        return None
+
+    base, _, base_year = base_version.partition(':')
+    year = df.attrs['version'].partition(':')[2]
+    if base != delta['base'] or year != base_year:
+        return None
+
+    if year:
+        # An academic year slice: positions are relative to the year's first row
+        offset = df.attrs['row_range'][0]
+        ranges = [delta['rows'][year]] if year in delta['rows'] else []
+    else:
+        offset = 0
+        ranges = list(delta['rows'].values())
+    positions = [np.arange(start, stop) - offset for start, stop in ranges]
+    return df.iloc[np.concatenate(positions) if positions else np.array([], dtype=np.intp)]
+
+def apply_cube_delta(cube, rows):
+    """Add the counts of newly appended roster rows to a count cube
+
+    Only the new rows are grouped; their counts are then merged into the
+    existing cells, so the cost follows the new rows and the cube, not the roster.
+    """
+    if not len(rows):
+        return cube.copy()
+
+    delta = build_count_cube(rows)
+    dims = [col for col in cube.columns if col != 'Students']
+    # The new roster's categories include any value first seen in the new rows
+    cube = cube.astype({col: delta[col].dtype for col in dims if isinstance(delta[col].dtype, pd.CategoricalDtype)})
+    merged = pd.concat([cube, delta], ignore_index=True)
+    merged = merged.groupby(dims, observed=True, dropna=False)['Students'].sum().reset_index()
+    if 'Date' in merged.columns:
+        merged = merged.sort_values('Date', kind='stable', na_position='last', ignore_index=True)
+    return merged
+
+def check_count_cube(cube, df):
+    """Whether a maintained count cube equals a full rebuild from the roster"""
+    expected = build_count_cube(df)
+    columns = list(expected.columns)
+    if sorted(cube.columns) != sorted(columns) or len(cube) != len(expected):
+        return False
+    # Compare cell by cell, so category order and dtype details don't matter
+    actual = cube[columns].astype({col: object for col in columns if col != 'Students'})
+    expected = expected.astype({col: object for col in columns if col != 'Students'})
+    return actual.reset_index(drop=True).equals(expected.reset_index(drop=True))
+
+def maintain_count_cube(cubes, df):
+    """Count cube of a roster version, carried in `cubes` ({academic year scope: cube}) between versions
+
+    When the roster only grew by appended rows, the previous version's cube
+    for the same academic year is updated from those rows instead of rebuilt.
+    Callers sharing `cubes` between threads hold a lock around the call.
+    """
+    scope = df.attrs['version'].partition(':')[2]
+    previous = cubes.get(scope)
+    if previous is not None and previous.attrs['version'] == df.attrs['version']:
+        return previous
+
+    rows = get_appended_rows(df, previous.attrs['version'] if previous is not None else None)
+    if rows is None:
+        cube = build_count_cube(df)
+    else:
+        with diagnostics.stage('count_cube_delta') as record:
+            record['rows'] = len(rows)
+            cube = apply_cube_delta(previous, rows)
+            if CHECK_AGGREGATES:
+                record['consistent'] = check_count_cube(cube, df)
+                if not record['consistent']:
+                    cube = build_count_cube(df)
+
+    cube.attrs['version'] = df.attrs['version']
+    cubes[scope] = cube
+    return cube
+
+def filter_cube_by_status(cube, view):
+    """Return the cube cells counted by a STATUS_VIEWS view, in the cube's date order
+
+    The result is always a new frame, so callers can set its attrs without
+    touching the shared cube.
+    """
+    statuses = STATUS_VIEWS[view]
+    if statuses is None or 'Status' not in cube.columns:
+        return cube.copy(deep=False)
+    return cube[cube['Status'].isin(statuses).to_numpy()].reset_index(drop=True)
+
+def get_status_selections(view):
+    """Filter index selections restricting a query to a STATUS_VIEWS view"""
+    statuses = STATUS_VIEWS[view]
+    return {} if statuses is None else {'Status': statuses}
+
+def slice_cube_by_date(cube, start_date, end_date):
+    """Return the cube cells dated within [start_date, end_date] without scanning"""
+    dates = cube['Date'].to_numpy()
+    lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date)), side='left')
+    hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end_date) + pd.Timedelta(days=1)), side='left')
+    return cube.iloc[lo:hi]
+
+def rollup_cube(cube, dims):
+    """Sum the count cube down to the given dimensions"""
+    return cube.groupby(dims, observed=True)['Students'].sum().reset_index()
+
+def build_subtotal_table(counts, dims, value_col, subtotal_labels, grand_total_labels, formatters=None, grand_total=None, markup=True):
+    """Build a display table with subtotal rows for each level of `dims` and a grand total
+
+    `counts` holds one row per combination of `dims` with its count in `value_col`.
+    Each subtotal level is one groupby over the (small) counts frame, rows are
+    ordered with a single sort on factorized codes and labels are formatted a
+    column at a time, so there is no per-group filtering or iterrows.
+    With markup=False totals are left unbolded and counts stay integers.
+    """
+    formatters = formatters or {}
+    depth = len(dims)
+    bold = '**' if markup else ''
+
+    # Factorize each dimension; code len(uniques) marks a rolled-up ("All ...") cell and sorts last
+    codes = {}
+    labels = {}
+    for dim in dims:
+        dim_codes, uniques = pd.factorize(counts[dim], sort=True)
+        codes[dim] = dim_codes
+        unique_values = pd.Series(uniques)
+        text = formatters[dim](unique_values) if dim in formatters else unique_values.astype(str)
+        all_label = f"{bold}{subtotal_labels.get(dim, 'All')}{bold}"
+        labels[dim] = np.append(text.to_numpy(dtype=object), all_label)
+
+    detail = pd.DataFrame(codes)
+    detail[value_col] = counts[value_col].to_numpy()
+    detail['_level'] = depth
+
+    levels = [detail]
+    for level in range(1, depth):
+        subtotal = detail.groupby(dims[:level], sort=False)[value_col].sum().reset_index()
+        for dim in dims[level:]:
+            subtotal[dim] = len(labels[dim]) - 1
+        subtotal['_level'] = level
+        levels.append(subtotal)
+
+    table = pd.concat(levels, ignore_index=True).sort_values(dims, kind='stable')
+    level = table['_level'].to_numpy()
+
+    display = {}
+    for i, dim in enumerate(dims):
+        column = labels[dim][table[dim].to_numpy()]
+        # The last grouped dimension of a subtotal row names the group being totalled
+        is_subtotal_key = (level == i + 1) & (level < depth)
+        column[is_subtotal_key] = bold + column[is_subtotal_key] + f' - Subtotal{bold}'
+        display[dim] = column
+
+    if markup:
+        values = table[value_col].to_numpy().astype(str).astype(object)
+        is_total = level < depth
+        values[is_total] = '**' + values[is_total] + '**'
+    else:
+        values = table[value_col].to_numpy()
+    display[value_col] = values
+
+    display_df = pd.DataFrame(display)
+
+    # Add grand total
+    if grand_total is None:
+        grand_total = int(counts[value_col].sum())
+    grand_total_row = [f'{bold}{label}{bold}' for label in grand_total_labels]
+    grand_total_row.append(f'**{grand_total}**' if markup else grand_total)
+    display_df.loc[len(display_df)] = grand_total_row
+
+    return display_df
+
+def build_year_course_table(cube, markup=True):
+    """Year & Course statistics: students per year and course with subtotals"""
+    stats_table = rollup_cube(cube, ['Year', 'Course']).rename(columns={'Students': 'Total Students'})
+    return build_subtotal_table(
+        stats_table,
+        ['Year', 'Course'],
+        'Total Students',
+        subtotal_labels={'Course': 'All Courses'},
+        grand_total_labels=['GRAND TOTAL', 'ALL YEARS'],
+        grand_total=int(cube['Students'].sum()),
+        markup=markup
+    )
+
+def build_datewise_counts(cube):
+    """Admissions per date and course, in date order"""
+    # The cube keeps real dates, so it already sorts chronologically
+    return rollup_cube(cube, ['Date', 'Course']).rename(columns={'Students': 'Admissions'})
+
+def build_datewise_chart_data(cube, max_periods=MAX_CHART_PERIODS):
+    """Admissions per period and course for the date-wise chart
+
+    Uses the finest of CHART_BINS that gives at most max_periods periods
+    (monthly otherwise). Returns (frame with Period, Start, Course and
+    Admissions columns, bin name).
+    """
+    counts = build_datewise_counts(cube)
+    for bin_name, freq, label_format in CHART_BINS:
+        starts = counts['Date'].dt.to_period(freq).dt.start_time
+        if starts.nunique() <= max_periods:
+            break
+
+    binned = counts.groupby([starts.rename('Start'), 'Course'], observed=True)['Admissions'].sum().reset_index()
+    binned.insert(0, 'Period', binned['Start'].dt.strftime(label_format))
+    return binned, bin_name
+
+def build_daily_admissions(cube):
+    """Admissions per day (rows) and course (columns, plus Total) over a gap-free date index"""
+    counts = rollup_cube(cube, ['Date', 'Course'])
+    daily = counts.pivot_table(index='Date', columns='Course', values='Students', aggfunc='sum', fill_value=0, observed=True)
+    daily.columns = daily.columns.astype(str)
+    daily.columns.name = None
+    # Days without admissions are zeros, so resampling and rolling windows count calendar days
+    daily = daily.asfreq('D', fill_value=0) if len(daily) else daily
+    daily['Total'] = daily.sum(axis=1)
+    return daily.astype('int64')
+
+def find_first_change(previous, daily):
+    """First day from which `daily` differs from `previous`, or None when they are equal"""
+    if (
+        not len(previous) or not previous.columns.equals(daily.columns)
+        or previous.index[0] != daily.index[0] or len(daily) < len(previous)
+    ):
+        return daily.index[0]
+
+    changed = (daily.iloc[:len(previous)].to_numpy() != previous.to_numpy()).any(axis=1)
+    if changed.any():
+        return previous.index[changed.argmax()]
+    if len(daily) > len(previous):
+        return daily.index[len(previous)]
+    return None
+
+def update_time_series(series, daily):
+    """Daily, weekly and monthly admissions with cumulative totals and rolling averages
+
+    `series` is the result of an earlier call (or None) and `daily` the current
+    build_daily_admissions output. Only the periods from the one holding the
+    first changed day onwards are resampled again; earlier periods, their running
+    totals and rolling averages are kept. Returns {interval: {'admissions',
+    'cumulative'[, 'rolling']}}; each frame has one column per course plus Total.
+    """
+    first_change = None
+    if series is not None and len(daily):
+        previous = series['Daily']['admissions']
+        first_change = find_first_change(previous, daily)
+        if first_change is None:
+            return series
+        # Periods before a moved first day or under other courses no longer hold, so nothing is kept
+        if not len(previous) or previous.index[0] != daily.index[0] or not previous.columns.equals(daily.columns):
+            first_change = None
+
+    updated = {}
+    for interval, rule in TIME_SERIES_RULES.items():
+        kept = None
+        tail = daily
+        if first_change is not None:
+            labels = series[interval]['admissions'].index
+            before = labels[labels <= first_change]
+            if len(before):
+                start = before[-1]
+                kept = {name: frame[frame.index < start] for name, frame in series[interval].items()}
+                tail = daily.loc[start:]
+
+        admissions = tail.resample(rule, label='left', closed='left').sum() if len(tail) else tail
+        cumulative = admissions.cumsum()
+        if kept is not None and len(kept['cumulative']):
+            cumulative += kept['cumulative'].iloc[-1]
+        result = {'admissions': admissions, 'cumulative': cumulative}
+
+        if interval == 'Daily':
+            # The first recomputed window reaches back ROLLING_DAYS - 1 days into the kept history
+            history = kept['admissions'].iloc[-(ROLLING_DAYS - 1):] if kept is not None else admissions.iloc[:0]
+            rolling = pd.concat([history, admissions]).rolling(ROLLING_DAYS, min_periods=1).mean()
+            result['rolling'] = rolling.iloc[len(history):]
+
+        if kept is not None:
+            result = {name: pd.concat([kept[name], frame]) for name, frame in result.items()}
+        updated[interval] = result
+    return updated
+
+def check_time_series(series, daily):
+    """Whether incrementally updated time series equal a full recompute from `daily`"""
+    expected = update_time_series(None, daily)
+    return all(
+        series[interval][name].equals(frame)
+        for interval, frames in expected.items()
+        for name, frame in frames.items()
+    )
+
+def build_datewise_table(cube, markup=True):
+    """Date-wise admission statistics: admissions per date and course with subtotals"""
+    return build_subtotal_table(
+        build_datewise_counts(cube),
+        ['Date', 'Course'],
+        'Admissions',
+        subtotal_labels={'Course': 'All Courses'},
+        grand_total_labels=['GRAND TOTAL', 'ALL DATES'],
+        formatters={'Date': lambda dates: dates.dt.strftime(DATE_LABEL_FORMAT)},
+        grand_total=int(cube['Students'].sum()),
+        markup=markup
+    )
+
+def freeze_arrays(*arrays):
+    """Mark numpy arrays read-only so a session can't modify data shared with the others"""
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+def build_filter_index(df):
+    """Index the roster for filtering: row positions per value of each filter column
+
+    Also keeps the row order sorted by Date so date ranges are two binary searches.
+    """
+    index = {'size': len(df), 'columns': {}}
+
+    for col in FILTER_COLUMNS:
+        if col not in df.columns:
+            continue
+
+        codes, uniques = pd.factorize(df[col], sort=True)
+        order = np.argsort(codes, kind='stable')
+        freeze_arrays(codes, order)
+        # Missing values get code -1 and sort first; bounds split the rest by value
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        index['columns'][col] = {
+            'codes': codes,
+            'values': list(uniques),
+            'rows': {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)},
+        }
+
+    if 'Date' in df.columns:
+        dates = df['Date'].to_numpy()
+        date_order = np.argsort(dates, kind='stable')
+        index['dates'] = dates
+        index['date_order'] = date_order
+        index['sorted_dates'] = freeze_arrays(dates[date_order])[0]
+        freeze_arrays(dates, date_order)
+
+    return index
+
+def query_filter_index(index, selections, date_range=None):
+    """Return the sorted row positions matching every selection
+
+    `selections` maps a filter column to the values to keep. Matching starts
+    from the most selective dimension and only its surviving rows are checked
+    against the others, so cost follows the size of the result, not the roster.
+    """
+    candidates = []
+    for col, values in selections.items():
+        column = index['columns'][col]
+        rows = [column['rows'][value] for value in values if value in column['rows']]
+        size = sum(len(r) for r in rows)
+        candidates.append((size, col, rows))
+
+    if date_range is not None and 'date_order' in index:
+        start, end = (np.datetime64(pd.Timestamp(d)) for d in date_range)
+        lo = np.searchsorted(index['sorted_dates'], start, side='left')
+        hi = np.searchsorted(index['sorted_dates'], end + np.timedelta64(1, 'D'), side='left')
+        candidates.append((hi - lo, 'Date', [index['date_order'][lo:hi]]))
+
+    if not candidates:
+        return np.arange(index['size'])
+
+    candidates.sort(key=lambda candidate: candidate[0])
+    _, first_col, first_rows = candidates[0]
+    positions = np.sort(np.concatenate(first_rows)) if first_rows else np.array([], dtype=np.intp)
+
+    for _, col, _ in candidates[1:]:
+        if not len(positions):
+            break
+        if col == 'Date':
+            dates = index['dates'][positions]
+            positions = positions[(dates >= start) & (dates < end + np.timedelta64(1, 'D'))]
+        else:
+            column = index['columns'][col]
+            keep = np.zeros(len(column['values']) + 1, dtype=bool)
+            for value in selections[col]:
+                if value in column['rows']:
+                    keep[column['values'].index(value)] = True
+            # Code -1 (missing) maps to the last, always-False slot
+            positions = positions[keep[column['codes'][positions]]]
+
+    return positions
+
+def normalize_search_text(value):
+    """Lower-case text with every run of punctuation or spaces collapsed to one space"""
+    return SEARCH_SEPARATORS.sub(' ', str(value).lower()).strip()
+
+def build_trigram_postings(texts):
+    """Map each trigram of the normalized texts to the sorted ids of the texts containing it
+
+    Trigrams are cut with one vectorized slice per character position rather
+    than per text, as get_trigrams(text) would for each text.
+    """
+    padded = ' ' + texts + ' '
+    lengths = padded.str.len().to_numpy()
+    grams, ids = [], []
+    for start in range(int(lengths.max(initial=0)) - 2):
+        has_gram = np.flatnonzero(lengths >= start + 3)
+        grams.append(padded.iloc[has_gram].str[start:start + 3].to_numpy(dtype=object))
+        ids.append(has_gram)
+    if not grams:
+        return {}
+
+    # One sorted key per (trigram, text) pair: sorts by trigram then text and drops trigrams repeated in a text
+    gram_codes, gram_values = pd.factorize(np.concatenate(grams))
+    keys = np.sort(gram_codes.astype(np.int64) * len(texts) + np.concatenate(ids))
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    value_ids = (keys % len(texts)).astype(np.int32)
+    bounds = np.searchsorted(keys // len(texts), np.arange(len(gram_values) + 1))
+    return {gram: value_ids[bounds[i]:bounds[i + 1]] for i, gram in enumerate(gram_values)}
+
+def get_trigrams(text, pad_end=True):
+    """Set of three-character substrings of text, padded so word starts (and ends) count
+
+    Queries are padded at the start only, so a partly typed word still
+    matches every trigram of the values beginning with it.
+    """
+    padded = ' ' + text + (' ' if pad_end else '')
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def build_search_index(df):
+    """Trigram index over the SEARCH_COLUMNS values, for ranked fuzzy search
+
+    Each column's distinct values are indexed once: trigram -> ids of the
+    values containing it, and value id -> the rows holding that value.
+    """
+    index = {'size': len(df), 'columns': {}}
+
+    for col in SEARCH_COLUMNS:
+        if col not in df.columns:
+            continue
+
+        codes, uniques = pd.factorize(df[col])
+        texts = (
+            pd.Series(np.asarray(uniques, dtype=object), dtype=object).astype(str).str.lower()
+            .str.replace(SEARCH_SEPARATORS.pattern, ' ', regex=True).str.strip()
+        )
+
+        # Rows of each value, as in build_filter_index; missing values (code -1) sort first and are never matched
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        index['columns'][col] = {
+            'grams': build_trigram_postings(texts),
+            'lengths': texts.str.len().to_numpy(),
+            'order': freeze_arrays(order)[0],
+            'bounds': bounds,
+        }
+
+    return index
+
+def search_students(index, query, limit=SEARCH_LIMIT, min_score=SEARCH_MIN_SCORE):
+    """Rank the rows whose search columns best match a query
+
+    A value's score is the share of the query's trigrams it contains, so
+    prefixes score 1 and typos lower it gradually; ties go to the shorter
+    value, then to the roster order. Each row keeps its best column's score.
+    Only the posting lists of the query's trigrams are read, never the rows.
+    Returns (row positions, scores, number of matching rows).
+    """
+    empty = np.array([], dtype=np.intp), np.array([]), 0
+    text = normalize_search_text(query)
+    if len(text) < SEARCH_MIN_CHARS:
+        return empty
+
+    query_grams = get_trigrams(text, pad_end=False)
+    needed = max(1, int(np.ceil(len(query_grams) * min_score)))
+
+    rows, scores, lengths = [], [], []
+    for column in index['columns'].values():
+        postings = [column['grams'][gram] for gram in query_grams if gram in column['grams']]
+        if len(postings) < needed:
+            continue
+        shared = np.bincount(np.concatenate(postings), minlength=len(column['lengths']))
+        matched = np.flatnonzero(shared >= needed)
+        if not len(matched):
+            continue
+
+        # Expand each matched value to its rows without a Python loop over values
+        starts = column['bounds'][matched]
+        counts = column['bounds'][matched + 1] - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows.append(column['order'][np.repeat(starts, counts) + offsets])
+        scores.append(np.repeat(shared[matched] / len(query_grams), counts))
+        lengths.append(np.repeat(column['lengths'][matched], counts))
+
+    if not rows:
+        return empty
+
+    rows, scores, lengths = np.concatenate(rows), np.concatenate(scores), np.concatenate(lengths)
+    ranked = np.lexsort((rows, lengths, -scores))
+    # The first time a row appears in rank order is its best match
+    _, best = np.unique(rows[ranked], return_index=True)
+    best = ranked[np.sort(best)]
+    return rows[best[:limit]], scores[best[:limit]], len(best)
+
+def build_search_results(df, positions, scores):
+    """Rows found by search_students, with their match score, ready for display"""
+    columns = [col for col in SEARCH_RESULT_COLUMNS if col in df.columns]
+    results = df.iloc[positions, df.columns.get_indexer(columns)].reset_index(drop=True)
+    if 'Date' in results.columns:
+        results['Date'] = results['Date'].dt.strftime(DATE_LABEL_FORMAT)
+    results['Match'] = (np.asarray(scores) * 100).round().astype(int).astype(str) + '%'
+    return results
+
+def get_student_list_columns(df):
+    """Columns shown in the Student List, in display order"""
+    # Add additional columns if they exist
+    return [col for col in STUDENT_LIST_COLUMNS if col in df.columns]
+
+def build_student_page(df, positions, start, stop, date_format=DATE_LABEL_FORMAT):
+    """Materialize rows [start, stop) of a filtered list, ready for display or export"""
+    columns = get_student_list_columns(df)
+    page = df.iloc[positions[start:stop], df.columns.get_indexer(columns)].reset_index(drop=True)
+    return format_student_page(page, start, date_format)
+
+def format_student_page(page, start, date_format=DATE_LABEL_FORMAT):
+    """Format Student List rows starting at list position `start` for display or export"""
+    # Dates are stored as datetimes; the dd-mmm-yy (or date_format) label is only built for the rows shown
+    if 'Date' in page.columns:
+        page['Date'] = page['Date'].dt.strftime(date_format)
+
+    # Serial numbers follow the position in the whole list, not the page
+    serial_numbers = np.arange(start + 1, start + len(page) + 1).astype(str)
+    page.insert(0, 'Sl No', np.char.zfill(serial_numbers, 2) if len(page) else serial_numbers)
+    return page
@@ -0,0 +1,304 @@
+"""Serve the dashboard figures as JSON for other screens, without Streamlit
+
+    python api.py --port 8502
+    curl "http://localhost:8502/stats?status=Admitted"
+    curl "http://localhost:8502/datewise?start=2025-05-12&end=2025-05-31"
+    curl "http://localhost:8502/students?year=1st%20Yr&course=CS,ME&limit=20"
+
+Every response carries an ETag naming the data version and the request; send
+it back in If-None-Match to get 304 Not Modified while the files are unchanged.
+
+Responses hold student names and Reg Nos, so browser pages may only read them
+from origins named with --allow-origin, e.g. the notice board's:
+
+    python api.py --allow-origin http://noticeboard.local:8080
+"""
+import argparse
+import hashlib
+import json
+import threading
+import traceback
+from collections import OrderedDict
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import analytics
+import data_loader
+import diagnostics
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+
+# Encoded responses kept per data version and request, so repeated polls aren't recomputed
+RESPONSE_CACHE_SIZE = 256
+
+# Dates in responses are ISO dates, whichever label the dashboard shows
+ISO_DATE_FORMAT = '%Y-%m-%d'
+
+# Student list rows returned per request by default, and at most
+STUDENT_LIMIT = 100
+MAX_STUDENT_LIMIT = 1000
+
+# /students query parameters and the filter index column each one selects on
+STUDENT_FILTERS = {
+    'year': 'Year',
+    'course': 'Course',
+    'cat': 'Cat',
+    'adm_type': 'Adm Type',
+    'adm_cat': 'Adm Cat',
+    'acdmc_year': 'Acdmc Year',
+}
+
+# Per-process state shared by the request threads
+_state_lock = threading.Lock()
+_responses = OrderedDict()
+_cubes = {}
+_indexes = {}
+
+class ApiError(Exception):
+    """A request the API can't answer, with its HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def fail(status, message):
+    """Raise an error response with a JSON body"""
+    raise ApiError(status, message)
+
+def load_roster(folder, academic_year=None):
+    """Current roster, optionally narrowed to one academic year; unchanged files cost a stat"""
+    source_files = data_loader.discover_source_files(folder)
+    if not source_files:
+        fail(HTTPStatus.SERVICE_UNAVAILABLE, f"No CSV or Excel files found in {folder}")
+
+    df = data_loader.load_dataset(data_loader.get_fingerprints(source_files))
+    if academic_year is None:
+        return df
+
+    partitions = df.attrs.get('partitions', {})
+    if academic_year not in partitions:
+        fail(HTTPStatus.NOT_FOUND, f"Academic year {academic_year} not found; loaded: {', '.join(sorted(partitions))}")
+    return analytics.slice_academic_year(df, academic_year)
+
+def get_count_cube(df):
+    """Count cube of a roster version, updated from the previous version's when rows were only appended"""
+    with _state_lock:
+        return analytics.maintain_count_cube(_cubes, df)
+
+def get_filter_index(df):
+    """Student List filter index of a roster version"""
+    scope = df.attrs['version'].partition(':')[2]
+    with _state_lock:
+        cached = _indexes.get(scope)
+        if cached is None or cached[0] != df.attrs['version']:
+            cached = _indexes[scope] = (df.attrs['version'], analytics.build_filter_index(df))
+        return cached[1]
+
+def get_values(params, name):
+    """Values of a repeatable query parameter; each may also hold a comma-separated list"""
+    return [value.strip() for raw in params.get(name, []) for value in raw.split(',') if value.strip()]
+
+def get_status(params):
+    """Status view named by the status parameter (default: Admitted)"""
+    status = (params.get('status') or ['Admitted'])[-1]
+    if status not in analytics.STATUS_VIEWS:
+        fail(HTTPStatus.BAD_REQUEST, f"Unknown status {status}; use one of {', '.join(analytics.STATUS_VIEWS)}")
+    return status
+
+def get_date_range(params):
+    """(start, end) dates from the ISO start and end parameters, or None for every date"""
+    if 'start' not in params and 'end' not in params:
+        return None
+    try:
+        start = date.fromisoformat(params.get('start', ['0001-01-01'])[-1])
+        end = date.fromisoformat(params.get('end', ['9999-12-31'])[-1])
+    except ValueError:
+        fail(HTTPStatus.BAD_REQUEST, "start and end must be ISO dates, e.g. 2025-05-12")
+    return start, end
+
+def get_int(params, name, default, maximum=None):
+    """Non-negative integer parameter"""
+    try:
+        value = int(params.get(name, [default])[-1])
+    except ValueError:
+        fail(HTTPStatus.BAD_REQUEST, f"{name} must be a whole number")
+    if value < 0:
+        fail(HTTPStatus.BAD_REQUEST, f"{name} must not be negative")
+    return min(value, maximum) if maximum is not None else value
+
+def to_records(frame):
+    """Frame rows as JSON-ready dicts, with dates as ISO dates"""
+    if 'Date' in frame.columns and hasattr(frame['Date'], 'dt'):
+        frame = frame.assign(Date=frame['Date'].dt.strftime(ISO_DATE_FORMAT))
+    return json.loads(frame.to_json(orient='records'))
+
+def get_summary(df, params):
+    """Data version, row count and academic years of the roster"""
+    return {
+        'rows': len(df),
+        'generation': df.attrs.get('generation'),
+        'academic_years': sorted(df.attrs.get('partitions', {})),
+        'endpoints': sorted(ENDPOINTS),
+    }
+
+def get_stats(df, params):
+    """Year & Course statistics of a status view"""
+    status = get_status(params)
+    cube = analytics.filter_cube_by_status(get_count_cube(df), status)
+    return {
+        'status': status,
+        'total': int(cube['Students'].sum()),
+        'by_year_course': to_records(analytics.rollup_cube(cube, ['Year', 'Course'])),
+        'by_course': to_records(analytics.rollup_cube(cube, ['Course'])),
+        'by_year': to_records(analytics.rollup_cube(cube, ['Year'])),
+    }
+
+def get_datewise(df, params):
+    """Admissions per date and course of a status view, optionally between two dates"""
+    status = get_status(params)
+    date_range = get_date_range(params)
+    cube = analytics.filter_cube_by_status(get_count_cube(df), status)
+    if date_range:
+        cube = analytics.slice_cube_by_date(cube, *date_range)
+    return {
+        'status': status,
+        'total': int(cube['Students'].sum()),
+        'by_date_course': to_records(analytics.build_datewise_counts(cube)),
+        'by_date': to_records(analytics.rollup_cube(cube, ['Date'])),
+    }
+
+def get_students(df, params):
+    """One page of the Student List for a status view and filters"""
+    status = get_status(params)
+    index = get_filter_index(df)
+    selections = {}
+    for name, col in STUDENT_FILTERS.items():
+        values = get_values(params, name)
+        if values and col in index['columns']:
+            selections[col] = values
+    selections.update(analytics.get_status_selections(status))
+
+    positions = analytics.query_filter_index(index, selections, get_date_range(params))
+    offset = get_int(params, 'offset', 0)
+    limit = get_int(params, 'limit', STUDENT_LIMIT, MAX_STUDENT_LIMIT)
+    start = min(offset, len(positions))
+    stop = min(start + limit, len(positions))
+    return {
+        'status': status,
+        'total': len(positions),
+        'offset': offset,
+        'limit': limit,
+        'rows': to_records(analytics.build_student_page(df, positions, start, stop, ISO_DATE_FORMAT)),
+    }
+
+ENDPOINTS = {
+    '/': get_summary,
+    '/stats': get_stats,
+    '/datewise': get_datewise,
+    '/students': get_students,
+}
+
+def get_etag(version, path, query):
+    """ETag of a request's response: the data version plus a hash of the normalized request"""
+    request = hashlib.sha1(f"{path}?{query}".encode('utf-8')).hexdigest()[:12]
+    return f'"{version}-{request}"'
+
+def respond(folder, url, if_none_match=None):
+    """Answer a GET request; returns (status, headers, body bytes)"""
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/') or '/'
+    if path not in ENDPOINTS:
+        fail(HTTPStatus.NOT_FOUND, f"Unknown endpoint {path}; use one of {', '.join(sorted(ENDPOINTS))}")
+
+    pairs = sorted(parse_qsl(parts.query))
+    params = {}
+    for name, value in pairs:
+        params.setdefault(name, []).append(value)
+    academic_year = params.pop('academic_year', [None])[-1]
+
+    df = load_roster(folder, academic_year)
+    version = df.attrs['version']
+    query = '&'.join(f"{name}={value}" for name, value in pairs)
+    etag = get_etag(version, path, query)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+    # The client already has this version: nothing is computed or sent
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return HTTPStatus.NOT_MODIFIED, headers, b''
+
+    key = (version, path, query)
+    with _state_lock:
+        body = _responses.get(key)
+        if body is not None:
+            _responses.move_to_end(key)
+    if body is None:
+        payload = {'version': version, **ENDPOINTS[path](df, params)}
+        body = json.dumps(payload).encode('utf-8')
+        with _state_lock:
+            _responses[key] = body
+            while len(_responses) > RESPONSE_CACHE_SIZE:
+                _responses.popitem(last=False)
+
+    return HTTPStatus.OK, headers, body
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """GET handler; the source folder is set on the server"""
+
+    def do_GET(self):
+        with diagnostics.stage('api', session='api') as record:
+            try:
+                status, headers, body = respond(self.server.folder, self.path, self.headers.get('If-None-Match'))
+            except ApiError as e:
+                status, headers, body = e.status, {}, json.dumps({'error': e.message}).encode('utf-8')
+            except Exception:
+                # Still answer, so a client sees the failure instead of a dropped connection; details go to the log
+                traceback.print_exc()
+                status, headers = HTTPStatus.INTERNAL_SERVER_ERROR, {}
+                body = json.dumps({'error': "Internal error; see the API server's log"}).encode('utf-8')
+            record['path'] = self.path
+            record['status'] = int(status)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        # Only the screens named with --allow-origin may read the roster from their own pages
+        origin = self.headers.get('Origin')
+        if origin and origin in self.server.allowed_origins:
+            self.send_header('Access-Control-Allow-Origin', origin)
+        self.send_header('Vary', 'Origin')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Serve the dashboard statistics and student lists as JSON.")
+    parser.add_argument('--folder', default='.', help="folder holding the CSV/Excel exports (default: current folder)")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument(
+        '--allow-origin', action='append', default=[], metavar='ORIGIN',
+        help="origin whose browser pages may read the responses, e.g. http://noticeboard.local:8080 (repeatable; default: none)"
+    )
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    server.folder = args.folder
+    server.allowed_origins = set(args.allow_origin)
+    print(f"Serving {args.folder} on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import os
-import glob
-from io import BytesIO
+import threading
+import time
+import uuid
+import analytics
+import data_loader
+import diagnostics
+import exports
+import store
 
 # Page configuration
 st.set_page_config(
@@ -237,59 +244,285 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+# Student List page sizes
+STUDENT_PAGE_SIZES = [25, 50, 100, 200]
+
+# Student List filters beyond Year and Course, which have their own checkboxes
+EXTRA_FILTER_COLUMNS = ['Cat', 'Adm Type', 'Adm Cat', 'Acdmc Year']
+
+# Seconds between the background watcher's checks of the source files
+WATCH_INTERVAL_SECONDS = 2
+
+# Steps of the background warm-up, as shown in its progress bar
+WARMUP_STEPS = ["Loading the roster", "Counting students", "Drawing the charts", "Indexing the Student List"]
+
+@st.cache_resource(max_entries=2)
+def load_data_version(fingerprints):
+    """Return the preprocessed roster for one version of the source files
+    
+    Held once per process and shared by every session instead of being
+    unpickled per call; copy-on-write keeps it read-only for the views taken from it.
+    The previous version stays cached while the warm-up prepares the next one.
+    Failures raise rather than return, so they aren't cached and the warm-up
+    and load_data can report them.
+    """
+    diagnostics.mark_cache_miss()
+    df = data_loader.load_dataset(fingerprints)
+    if store.STORE_PATH:
+        # Queries run against the SQLite store, kept at the same version as the roster
+        with diagnostics.stage('sync_store'):
+            store.sync_store(df, store.STORE_PATH, fingerprints)
+    return df
+
+@diagnostics.timed('load_data', cached=True)
 def load_data():
-    """Load and preprocess CSV data"""
+    """Load and preprocess every CSV/Excel export, re-parsing only the files that changed"""
     try:
-        # Look for CSV files in the current directory
-        csv_files = glob.glob("*.csv")
+        # Look for CSV and Excel files in the current directory
+        source_files = data_loader.discover_source_files()
         
-        if not csv_files:
-            st.error("No CSV files found in the project directory!")
-            return None
-            
-        # Load the first CSV file found
-        file_path = csv_files[0]
-        
-        # Try different encodings for CSV reading
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        df = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(file_path, encoding=encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if df is None:
-            st.error(f"Could not read CSV file with any supported encoding. Please ensure the file is properly formatted.")
+        if not source_files:
+            st.error("No CSV or Excel files found in the project directory!")
             return None
         
-        # Standardize column names
-        df.columns = df.columns.str.strip()
-        
-        # Filter data: only "In" status students, exclude "Due Fee" in remarks
-        df_filtered = df[
-            (df['In/Out'].str.strip().str.upper() == 'IN') &
-            (~df['Remarks'].str.contains('Due Fee', na=False, case=False))
-        ].copy()
-        
-        # Convert date to dd-mmm-yy format
-        if 'Date' in df_filtered.columns:
-            df_filtered['Date'] = pd.to_datetime(df_filtered['Date'], errors='coerce')
-            df_filtered['Formatted_Date'] = df_filtered['Date'].dt.strftime('%d-%b-%y')
-        
-        return df_filtered
+        # The fingerprints are part of the cache key, so edits are picked up on the next rerun
+        fingerprints = data_loader.get_fingerprints(source_files)
+        warmup = start_warmup()
+        if warmup['fingerprints'] is not None and warmup['error'] is None:
+            # Serve the version the warm-up last prepared; it picks up file changes within seconds
+            fingerprints = warmup['fingerprints']
+        return load_data_version(fingerprints)
         
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
 
-def create_metric_cards(df):
+@st.cache_resource
+def start_warmup():
+    """Start the per-process warm-up thread once; returns the progress state it shares with the sessions
+    
+    The thread prepares the roster and everything the default Statistics tab
+    and the Student List need, then keeps watching the source files and does
+    it again in the background whenever they change.
+    """
+    state = {'step': 0, 'fingerprints': None, 'error': None}
+    thread = threading.Thread(target=watch_sources, args=(state,), name="warmup", daemon=True)
+    thread.start()
+    return state
+
+def watch_sources(state):
+    """Warm the caches for every new version of the source files, polling their fingerprints"""
+    while True:
+        try:
+            source_files = data_loader.discover_source_files()
+            fingerprints = data_loader.get_fingerprints(source_files) if source_files else None
+            if fingerprints is not None and fingerprints != state['fingerprints']:
+                warm_caches(state, fingerprints)
+                state['error'] = None
+        except Exception as e:
+            # Sessions still load on their own; the next change is tried again
+            state['error'] = str(e)
+        finally:
+            state['step'] = None
+        time.sleep(WATCH_INTERVAL_SECONDS)
+
+def warm_caches(state, fingerprints):
+    """Build the cached roster, cubes, figures and indexes of one version in the order sessions need them"""
+    with diagnostics.stage('warmup', session='warmup'):
+        state['step'] = 0
+        # A failed load raises, so watch_sources records the error and sessions load the current files themselves
+        df = load_data_version(fingerprints)
+        if df.empty:
+            state['fingerprints'] = fingerprints
+            return
+        
+        # What a new session opens on: the latest academic year, admitted students
+        partitions = df.attrs.get('partitions', {})
+        if len(partitions) > 1:
+            df = analytics.slice_academic_year(df, max(partitions))
+        status = next(iter(analytics.STATUS_VIEWS))
+        
+        state['step'] = 1
+        cube = get_count_cube(df, status)
+        
+        state['step'] = 2
+        if 'Course' in cube.columns:
+            build_course_chart(cube, cube.attrs['version'])
+        
+        state['step'] = 3
+        get_filter_index(df)
+        get_search_index(df)
+        
+        state['fingerprints'] = fingerprints
+
+def wait_for_warmup():
+    """Show the warm-up's progress until the first version of the data is ready"""
+    state = start_warmup()
+    if state['step'] is None or state['fingerprints'] is not None:
+        return
+    
+    progress = st.progress(0.0, text="Preparing the dashboard...")
+    while True:
+        # Read once: the warm-up thread clears the step when it finishes
+        step = state['step']
+        if step is None or state['fingerprints'] is not None:
+            break
+        progress.progress(step / len(WARMUP_STEPS), text=f"Preparing the dashboard: {WARMUP_STEPS[step]}...")
+        time.sleep(0.1)
+    progress.empty()
+
+def select_academic_year(df):
+    """Let the user pick one academic year when several are loaded"""
+    partitions = df.attrs.get('partitions', {})
+    if len(partitions) <= 1:
+        return df
+    
+    years = sorted(partitions, reverse=True)
+    choice = st.selectbox("Academic Year", ["All Years"] + years, index=1, key="academic_year")
+    if choice == "All Years":
+        return df
+    
+    return analytics.slice_academic_year(df, choice)
+
+def show_source_info(df):
+    """Report which files and encodings the roster was read with"""
+    sources = df.attrs.get('sources')
+    if not sources:
+        return
+    
+    st.sidebar.markdown("### Data Sources")
+    if 'generation' in df.attrs:
+        st.sidebar.caption(f"Data version {df.attrs['generation']} ({df.attrs['version']})")
+    for source in sources:
+        if source.get('skipped'):
+            st.sidebar.warning(f"Skipped {source['file']}: {source['skipped']}.")
+            continue
+        if source['format'] == 'excel':
+            st.sidebar.caption(f"{source['file']} (sheet '{source['sheet']}')")
+        else:
+            st.sidebar.caption(f"{source['file']} ({source['encoding']})")
+        
+        if source['encoding_issue_count']:
+            locations = ", ".join(
+                f"line {issue['line']} (byte {issue['byte_offset']})" for issue in source['encoding_issues']
+            )
+            more = source['encoding_issue_count'] - len(source['encoding_issues'])
+            if more > 0:
+                locations += f" and {more} more"
+            st.sidebar.warning(f"{source['file']} is not valid UTF-8, read as {source['encoding']}. Affected bytes at {locations}.")
+        
+        if source['date_issue_count']:
+            rows = ", ".join(f"row {issue['row']} ('{issue['value']}')" for issue in source['date_issues'])
+            more = source['date_issue_count'] - len(source['date_issues'])
+            if more > 0:
+                rows += f" and {more} more"
+            st.sidebar.warning(f"{source['file']}: {source['date_issue_count']} dates don't match {data_loader.DATE_FORMAT}: {rows}.")
+
+@st.cache_data(max_entries=1)
+def build_memory_report(_df, data_version):
+    """Bytes per column of the roster as plain text columns vs the compact schema"""
+    return analytics.build_memory_report(_df)
+
+def show_memory_report(df):
+    """Sidebar table of memory used per column before and after compaction"""
+    if not st.sidebar.checkbox("Show memory report", key="show_memory_report"):
+        return
+    
+    report = build_memory_report(df, df.attrs['version'])
+    before, after = report.loc['Total', 'Before'], report.loc['Total', 'After']
+    st.sidebar.caption(f"{len(df):,} rows: {before / 1024:,.1f} KiB as text, {after / 1024:,.1f} KiB compact")
+    st.sidebar.dataframe(
+        report.rename(columns={'Before': 'Before (B)', 'After': 'After (B)'}),
+        use_container_width=True
+    )
+
+@diagnostics.timed('count_cube', cached=True)
+def get_count_cube(df, status):
+    """Return the student count cube of one status view for the current data version"""
+    return build_status_cube(df, df.attrs['version'], status)
+
+@st.cache_resource(max_entries=8)
+def build_count_cube(_df, data_version):
+    """Count cube for one data version, built once and shared between sessions"""
+    diagnostics.mark_cache_miss()
+    cube = None
+    if store.STORE_PATH:
+        try:
+            cube = store.build_count_cube(store.STORE_PATH, _df.attrs.get('row_range'), get_store_version(_df))
+        except store.StaleStoreError:
+            # The warm-up already wrote the next version's store; count this version in memory
+            pass
+    if cube is None:
+        cube = maintain_count_cube(_df)
+    cube.attrs['version'] = data_version
+    return cube
+
+def get_store_version(df):
+    """Version of the whole roster a (possibly year-sliced) roster was taken from, as the store records it"""
+    return df.attrs['version'].partition(':')[0]
+
+@st.cache_resource
+def get_cube_store():
+    """Per-process latest count cube of each academic year scope, carried from one data version to the next"""
+    return {'lock': threading.Lock(), 'cubes': {}}
+
+def maintain_count_cube(df):
+    """Count cube of a roster version
+    
+    When the roster only grew by appended rows, the previous version's cube
+    for the same academic year is updated from those rows instead of rebuilt.
+    """
+    cube_store = get_cube_store()
+    with cube_store['lock']:
+        return analytics.maintain_count_cube(cube_store['cubes'], df)
+
+@st.cache_resource(max_entries=32)
+def build_status_cube(_df, data_version, status):
+    """Cells of the version's count cube counted by one status view
+    
+    Switching views only filters the small cube; the roster isn't scanned again.
+    """
+    diagnostics.mark_cache_miss()
+    cube = analytics.filter_cube_by_status(build_count_cube(_df, data_version), status)
+    # Date slices of the cube keep the version, so figures and series built from them can be cached
+    cube.attrs['version'] = f"{data_version}:{status}"
+    return cube
+
+def select_status():
+    """Let the user pick which students the dashboard counts"""
+    return st.selectbox(
+        "Students",
+        list(analytics.STATUS_VIEWS),
+        index=0,
+        key="status_view",
+        help="Admitted excludes students with fees due; Out lists withdrawn students"
+    )
+
+def select_date_range(cube):
+    """Date range picker for the date-wise tab; returns the matching cube slice"""
+    dates = cube['Date'].dropna()
+    if dates.empty:
+        return cube
+    
+    first_date, last_date = dates.iloc[0].date(), dates.iloc[-1].date()
+    selected = st.date_input(
+        "Date range",
+        value=(first_date, last_date),
+        min_value=first_date,
+        max_value=last_date,
+        key="date_range"
+    )
+    
+    # The picker returns a single date while the user is still choosing the end of the range
+    if len(selected) != 2 or tuple(selected) == (first_date, last_date):
+        return cube
+    return analytics.slice_cube_by_date(cube, *selected)
+
+@diagnostics.timed('create_metric_cards')
+def create_metric_cards(cube):
     """Create summary metric cards"""
-    total_students = len(df)
-    total_courses = df['Course'].nunique() if 'Course' in df.columns else 0
+    total_students = int(cube['Students'].sum())
+    total_courses = cube['Course'].nunique() if 'Course' in cube.columns else 0
     
     col1, col2 = st.columns(2)
     
@@ -309,12 +542,13 @@ def create_metric_cards(df):
         </div>
         """, unsafe_allow_html=True)
 
-def create_course_strength_boxes(df):
+@diagnostics.timed('create_course_strength_boxes')
+def create_course_strength_boxes(cube):
     """Create course-wise student strength boxes"""
-    if 'Course' not in df.columns:
+    if 'Course' not in cube.columns:
         return
         
-    course_counts = df['Course'].value_counts().sort_index()
+    course_counts = analytics.rollup_cube(cube, ['Course']).set_index('Course')['Students'].sort_index()
     courses = list(course_counts.index)
     
     # Divide courses into rows if more than 5
@@ -359,44 +593,14 @@ def create_course_strength_boxes(df):
                 </div>
                 """, unsafe_allow_html=True)
 
-def create_year_course_stats_table(df):
+@diagnostics.timed('create_year_course_stats_table')
+def create_year_course_stats_table(cube):
     """Create year-course statistics table with styling"""
-    if 'Year' not in df.columns or 'Course' not in df.columns:
+    if 'Year' not in cube.columns or 'Course' not in cube.columns:
         return
         
-    # Create pivot table
-    stats_table = df.groupby(['Year', 'Course']).size().reset_index(name='Total Students')
-    
     # Create a formatted table for display
-    display_data = []
-    
-    for year in sorted(df['Year'].unique()):
-        year_data = stats_table[stats_table['Year'] == year]
-        
-        for _, row in year_data.iterrows():
-            display_data.append({
-                'Year': row['Year'],
-                'Course': row['Course'],
-                'Total Students': row['Total Students']
-            })
-        
-        # Add subtotal row
-        year_total = year_data['Total Students'].sum()
-        display_data.append({
-            'Year': f'**{year} - Subtotal**',
-            'Course': '**All Courses**',
-            'Total Students': f'**{year_total}**'
-        })
-    
-    # Add grand total
-    grand_total = df.shape[0]
-    display_data.append({
-        'Year': '**GRAND TOTAL**',
-        'Course': '**ALL YEARS**',
-        'Total Students': f'**{grand_total}**'
-    })
-    
-    display_df = pd.DataFrame(display_data)
+    display_df = analytics.build_year_course_table(cube)
     
     st.markdown('<div class="section-separator">📊 Year & Course Statistics</div>', unsafe_allow_html=True)
     st.dataframe(
@@ -410,12 +614,21 @@ def create_year_course_stats_table(df):
         }
     )
 
-def create_course_chart(df):
+@diagnostics.timed('create_course_chart')
+def create_course_chart(cube):
     """Create course-wise bar chart"""
-    if 'Course' not in df.columns:
+    if 'Course' not in cube.columns:
         return
         
-    course_year_stats = df.groupby(['Course', 'Year']).size().reset_index(name='Students')
+    with diagnostics.stage('course_chart_figure', cached=True):
+        fig = build_course_chart(cube, cube.attrs['version'])
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_resource(max_entries=8)
+def build_course_chart(_cube, data_version):
+    """Course-wise bar chart, built once per data version and shared between sessions"""
+    diagnostics.mark_cache_miss()
+    course_year_stats = analytics.rollup_cube(_cube, ['Course', 'Year'])
     
     fig = px.bar(
         course_year_stats,
@@ -442,46 +655,16 @@ def create_course_chart(df):
     fig.update_xaxes(title_font_size=16, tickfont_size=14)
     fig.update_yaxes(title_font_size=16, tickfont_size=14)
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-def create_datewise_stats(df):
+@diagnostics.timed('create_datewise_stats')
+def create_datewise_stats(cube):
     """Create date-wise admission statistics"""
-    if 'Formatted_Date' not in df.columns or 'Course' not in df.columns:
+    if 'Date' not in cube.columns or 'Course' not in cube.columns:
         return
         
-    # Group by date and course
-    date_stats = df.groupby(['Formatted_Date', 'Course']).size().reset_index(name='Admissions')
-    
     # Create display table with subtotals
-    display_data = []
-    
-    for date in sorted(df['Formatted_Date'].unique(), key=lambda x: pd.to_datetime(x, format='%d-%b-%y')):
-        date_data = date_stats[date_stats['Formatted_Date'] == date]
-        
-        for _, row in date_data.iterrows():
-            display_data.append({
-                'Date': row['Formatted_Date'],
-                'Course': row['Course'],
-                'Admissions': row['Admissions']
-            })
-        
-        # Add subtotal
-        date_total = date_data['Admissions'].sum()
-        display_data.append({
-            'Date': f'**{date} - Subtotal**',
-            'Course': '**All Courses**',
-            'Admissions': f'**{date_total}**'
-        })
-    
-    # Add grand total
-    grand_total = df.shape[0]
-    display_data.append({
-        'Date': '**GRAND TOTAL**',
-        'Course': '**ALL DATES**',
-        'Admissions': f'**{grand_total}**'
-    })
-    
-    display_df = pd.DataFrame(display_data)
+    display_df = analytics.build_datewise_table(cube)
     
     st.markdown('<div class="section-separator">📅 Date-wise Admission Statistics</div>', unsafe_allow_html=True)
     st.dataframe(
@@ -495,16 +678,29 @@ def create_datewise_stats(df):
         }
     )
     
-    # Create chart
-    chart_data = df.groupby(['Formatted_Date', 'Course']).size().reset_index(name='Admissions')
-    
+    # Create chart; the cube slice is identified by its version and date span
+    dates = cube['Date'].dropna()
+    date_span = (str(dates.iloc[0]), str(dates.iloc[-1]), len(cube)) if len(dates) else (None, None, len(cube))
+    with diagnostics.stage('datewise_chart_figure', cached=True):
+        fig = build_datewise_chart(cube, cube.attrs['version'], date_span, analytics.MAX_CHART_PERIODS)
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_resource(max_entries=16)
+def build_datewise_chart(_cube, data_version, date_span, max_periods):
+    """Date-wise trend chart per data version, date span and bar limit, shared between sessions
+    
+    Long spans are binned by week or month so the figure stays at most max_periods bar groups.
+    """
+    diagnostics.mark_cache_miss()
+    date_stats, bin_name = analytics.build_datewise_chart_data(_cube, max_periods)
     fig = px.bar(
-        chart_data,
-        x='Formatted_Date',
+        date_stats,
+        x='Period',
         y='Admissions',
         color='Course',
-        title='Daily Admission Trends by Course',
+        title=f'{bin_name} Admission Trends by Course',
         text='Admissions',
+        labels={'Period': 'Date' if bin_name == 'Daily' else bin_name[:-2]},
         color_discrete_sequence=px.colors.qualitative.Set2
     )
     
@@ -524,12 +720,286 @@ def create_datewise_stats(df):
     fig.update_xaxes(title_font_size=16, tickfont_size=14)
     fig.update_yaxes(title_font_size=16, tickfont_size=14)
     
+    return fig
+
+@st.cache_resource
+def get_time_series_store():
+    """Per-process time series by academic year and status view, extended as new days arrive"""
+    return {'lock': threading.Lock(), 'series': {}}
+
+@diagnostics.timed('time_series', cached=True)
+def get_time_series(cube):
+    """Return the admission time series of the current data version
+    
+    When the data changes, the previous version's series for the same academic
+    year and status view is extended from the first changed day instead of rebuilt.
+    """
+    version = cube.attrs['version']
+    scope = version.partition(':')[2]
+    series_store = get_time_series_store()
+    with series_store['lock']:
+        cached = series_store['series'].get(scope)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        diagnostics.mark_cache_miss()
+        daily = analytics.build_daily_admissions(cube)
+        series = analytics.update_time_series(cached[1] if cached else None, daily)
+        series_store['series'][scope] = (version, series)
+        return series
+
+@diagnostics.timed('create_time_series')
+def create_time_series(cube, selected):
+    """Create admission time series: admissions per interval and course, running totals and rolling averages"""
+    if 'Date' not in cube.columns or 'Course' not in cube.columns:
+        return
+    
+    interval = st.radio("Interval", list(analytics.TIME_SERIES_RULES), horizontal=True, key="time_series_interval")
+    # Built over the whole history so running totals count every admission; the date range only limits what is shown
+    series = get_time_series(cube)[interval]
+    admissions = series['admissions']
+    
+    dates = selected['Date'].dropna()
+    if not len(dates) or not len(admissions):
+        st.info("No admissions in the selected date range.")
+        return
+    first_period = admissions.index[admissions.index <= dates.iloc[0]].max()
+    shown = (admissions.index >= first_period) & (admissions.index <= dates.iloc[-1])
+    
+    label_format = {name: fmt for name, _, fmt in analytics.CHART_BINS}[interval]
+    labels = admissions.index[shown].strftime(label_format)
+    courses = [col for col in admissions.columns if col != 'Total']
+    
+    st.markdown(f'<div class="section-separator">📈 {interval} Admissions</div>', unsafe_allow_html=True)
+    
+    per_course = admissions.loc[shown, courses].set_axis(labels).rename_axis('Period').reset_index()
+    fig = px.bar(
+        per_course.melt(id_vars='Period', var_name='Course', value_name='Admissions'),
+        x='Period',
+        y='Admissions',
+        color='Course',
+        title=f'{interval} Admissions by Course',
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    if 'rolling' in series:
+        fig.add_trace(go.Scatter(
+            x=labels,
+            y=series['rolling'].loc[shown, 'Total'],
+            name=f'{analytics.ROLLING_DAYS}-day average (all courses)',
+            mode='lines',
+            line=dict(color='#2c3e50', width=3)
+        ))
+    fig.update_layout(
+        font_family="Inter",
+        font_size=14,
+        title_font_size=18,
+        title_font_family="Inter",
+        title_font_color="#2c3e50",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=500,
+        xaxis_tickangle=-45
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    cumulative = series['cumulative'].loc[shown].set_axis(labels).rename_axis('Period').reset_index()
+    fig = px.line(
+        cumulative.melt(id_vars='Period', var_name='Course', value_name='Students'),
+        x='Period',
+        y='Students',
+        color='Course',
+        title='Cumulative Admissions toward Intake',
+        markers=True,
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig.update_layout(
+        font_family="Inter",
+        font_size=14,
+        title_font_size=18,
+        title_font_family="Inter",
+        title_font_color="#2c3e50",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=450,
+        xaxis_tickangle=-45
+    )
     st.plotly_chart(fig, use_container_width=True)
+    
+    table = admissions.loc[shown].set_axis(labels)
+    table['Cumulative'] = series['cumulative'].loc[shown, 'Total'].to_numpy()
+    if 'rolling' in series:
+        table[f'{analytics.ROLLING_DAYS}-day Avg'] = series['rolling'].loc[shown, 'Total'].round(1).to_numpy()
+    st.dataframe(table.rename_axis(interval[:-2] if interval != 'Daily' else 'Date'), use_container_width=True)
+
+@diagnostics.timed('filter_index', cached=True)
+def get_filter_index(df):
+    """Return the Student List filter index for the current data version"""
+    return build_filter_index(df, df.attrs['version'])
+
+@st.cache_resource(max_entries=8)
+def build_filter_index(_df, data_version):
+    """Student List filter index for one data version, shared read-only between reruns and sessions"""
+    diagnostics.mark_cache_miss()
+    return analytics.build_filter_index(_df)
+
+@diagnostics.timed('search_index', cached=True)
+def get_search_index(df):
+    """Return the student search index for the current data version"""
+    return build_search_index(df, df.attrs['version'])
+
+@st.cache_resource(max_entries=8)
+def build_search_index(_df, data_version):
+    """Student search index for one data version, shared read-only between reruns and sessions"""
+    diagnostics.mark_cache_miss()
+    return analytics.build_search_index(_df)
+
+def show_student_search(df):
+    """Search box finding students by name, father's name, Reg No or receipt number as the user types"""
+    query = st.text_input(
+        "🔍 Find a student",
+        key="student_search",
+        type="search",
+        # Searches after a short pause in typing instead of waiting for Enter
+        live=True,
+        placeholder="Name, father's name, Reg No or receipt number"
+    )
+    if len(analytics.normalize_search_text(query or '')) < analytics.SEARCH_MIN_CHARS:
+        return
+    
+    with diagnostics.stage('student_search') as record:
+        positions, scores, total = analytics.search_students(get_search_index(df), query)
+        record['rows'] = total
+    
+    if not total:
+        st.info("No students match the search.")
+        return
+    
+    shown = f"best {len(positions)} of {total}" if total > len(positions) else str(total)
+    st.caption(f"Showing {shown} matches, across every status")
+    st.dataframe(analytics.build_search_results(df, positions, scores), use_container_width=True, hide_index=True)
 
-def create_student_list_tab(df):
+def create_extra_filters(index):
+    """Filters beyond Year/Course; returns (selections, date range or None)"""
+    selections = {}
+    date_range = None
+    
+    with st.expander("More Filters"):
+        columns = [col for col in EXTRA_FILTER_COLUMNS if col in index['columns']]
+        if columns:
+            filter_cols = st.columns(len(columns))
+            for i, col in enumerate(columns):
+                with filter_cols[i]:
+                    chosen = st.multiselect(col, index['columns'][col]['values'], key=f"filter_{col}")
+                # Nothing chosen means no restriction on this column
+                if chosen:
+                    selections[col] = chosen
+        
+        if 'sorted_dates' in index:
+            valid_dates = index['sorted_dates'][~np.isnat(index['sorted_dates'])]
+            if len(valid_dates):
+                first_date = pd.Timestamp(valid_dates[0]).date()
+                last_date = pd.Timestamp(valid_dates[-1]).date()
+                selected = st.date_input(
+                    "Admission date",
+                    value=(first_date, last_date),
+                    min_value=first_date,
+                    max_value=last_date,
+                    key="student_date_range"
+                )
+                if len(selected) == 2 and tuple(selected) != (first_date, last_date):
+                    date_range = tuple(selected)
+    
+    return selections, date_range
+
+@diagnostics.timed('show_student_page')
+def show_student_page(build_rows, total):
+    """Show one page of the filtered list, with the total count kept separately"""
+    diagnostics.set_rows(total)
+    
+    size_col, page_col, info_col = st.columns([1, 1, 2])
+    with size_col:
+        page_size = st.selectbox("Rows per page", STUDENT_PAGE_SIZES, index=1, key="student_page_size")
+    
+    page_count = max(1, -(-total // page_size))
+    if st.session_state.get('student_list_page', 1) > page_count:
+        st.session_state.student_list_page = page_count
+    
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="student_list_page")
+    
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    
+    with info_col:
+        st.markdown(f"**TOTAL: {total} Students** (showing {start + 1}-{stop}, page {page} of {page_count})")
+    
+    st.dataframe(
+        build_rows(start, stop),
+        use_container_width=True,
+        hide_index=True,
+        height=400
+    )
+
+def get_query_key(query):
+    """Hashable form of a Student List query, used to key cached exports"""
+    selections = tuple(sorted(
+        (col, tuple(sorted(str(value) for value in values))) for col, values in query['selections'].items()
+    ))
+    date_range = tuple(str(d) for d in query['date_range']) if query['date_range'] else None
+    return selections, date_range
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_student_export(_build_rows, total, data_version, query_key, fmt):
+    """Encode a filtered Student List; cached per data version, filter selection and format"""
+    diagnostics.mark_cache_miss()
+    return exports.export_rows(fmt, _build_rows, total)
+
+def generate_student_export(build_rows, total, data_version, query_key, fmt, session_id):
+    """Encode a filtered Student List for download, timed as a run of its own"""
+    with diagnostics.stage(f'export_{fmt}', cached=True, session=session_id) as record:
+        record['rows'] = total
+        return build_student_export(build_rows, total, data_version, query_key, fmt)
+
+def show_export_buttons(df, build_rows, total, query):
+    """Download buttons that only encode the list when clicked"""
+    data_version = df.attrs['version']
+    query_key = get_query_key(query)
+    session_id = get_session_id()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    cols = st.columns(len(exports.EXPORT_FORMATS))
+    for col, (fmt, (label, extension, mime)) in zip(cols, exports.EXPORT_FORMATS.items()):
+        with col:
+            st.download_button(
+                label=f"📥 Download {label}",
+                # A callable is only run when the button is clicked, on a separate thread
+                data=lambda fmt=fmt: generate_student_export(build_rows, total, data_version, query_key, fmt, session_id),
+                file_name=f"student_list_{timestamp}.{extension}",
+                mime=mime,
+                key=f"download_{fmt}",
+                on_click="ignore",
+                use_container_width=False
+            )
+
+def reset_student_filters():
+    """Clear every Student List filter and the generated list"""
+    st.session_state.selected_years = []
+    st.session_state.selected_courses = []
+    
+    filter_keys = ["all_years", "all_courses", "student_date_range", "student_list", "student_search"]
+    filter_keys += [f"filter_{col}" for col in EXTRA_FILTER_COLUMNS]
+    filter_keys += [key for key in st.session_state if key.startswith(("year_", "course_"))]
+    for key in filter_keys:
+        st.session_state.pop(key, None)
+
+def create_student_list_tab(df, status):
     """Create filtered student list with export functionality"""
     st.markdown('<div class="section-separator">👥 Student List with Filters</div>', unsafe_allow_html=True)
     
+    show_student_search(df)
+    
+    index = get_filter_index(df)
+    
     # Create two columns for Year and Course filters
     filter_col1, filter_col2 = st.columns(2)
     
@@ -538,7 +1008,7 @@ def create_student_list_tab(df):
         st.markdown('<div class="filter-section">', unsafe_allow_html=True)
         st.markdown('<div class="filter-title">Year</div>', unsafe_allow_html=True)
         
-        available_years = sorted(df['Year'].unique()) if 'Year' in df.columns else []
+        available_years = index['columns']['Year']['values'] if 'Year' in index['columns'] else []
         
         # Initialize session state for years (default: unchecked)
         if 'selected_years' not in st.session_state:
@@ -578,7 +1048,7 @@ def create_student_list_tab(df):
         st.markdown('<div class="filter-section">', unsafe_allow_html=True)
         st.markdown('<div class="filter-title">Course</div>', unsafe_allow_html=True)
         
-        available_courses = sorted(df['Course'].unique()) if 'Course' in df.columns else []
+        available_courses = index['columns']['Course']['values'] if 'Course' in index['columns'] else []
         
         # Initialize session state for courses (default: unchecked)
         if 'selected_courses' not in st.session_state:
@@ -613,130 +1083,218 @@ def create_student_list_tab(df):
         
         st.markdown('</div>', unsafe_allow_html=True)
     
+    extra_selections, date_range = create_extra_filters(index)
+    
     st.markdown("---")
     
     # Reset and Generate buttons
     col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 1, 2])
     
     with col2:
-        if st.button("🔄 Reset", use_container_width=True):
-            st.session_state.selected_years = []
-            st.session_state.selected_courses = []
-            st.rerun()
+        # Runs as a callback, before the fragment reruns, so the cleared widgets render unchecked
+        st.button("🔄 Reset", use_container_width=True, on_click=reset_student_filters)
     
     with col4:
         generate_list = st.button("📋 Generate List", use_container_width=True)
     
     st.markdown("---")
     
-    # Display data only when Generate List button is clicked
+    # Remember the filters when Generate List is clicked; the list then survives paging reruns
     if generate_list:
         if st.session_state.selected_years and st.session_state.selected_courses:
-            filtered_df = df[
-                (df['Year'].isin(st.session_state.selected_years)) &
-                (df['Course'].isin(st.session_state.selected_courses))
-            ].copy()
-            
-            if not filtered_df.empty:
-                # Add serial number (remove existing Sl No column if present)
-                filtered_df.reset_index(drop=True, inplace=True)
-                if 'Sl No' in filtered_df.columns:
-                    filtered_df.drop('Sl No', axis=1, inplace=True)
-                filtered_df.insert(0, 'Sl No', range(1, len(filtered_df) + 1))
-                filtered_df['Sl No'] = filtered_df['Sl No'].apply(lambda x: f"{x:02d}")
-                
-                # Select and reorder columns for display
-                display_columns = ['Sl No', 'Student Name', 'Father Name', 'Year', 'Course']
-                
-                # Add additional columns if they exist
-                optional_columns = ['Admn Year', 'Cat', 'Formatted_Date']
-                for col in optional_columns:
-                    if col in filtered_df.columns:
-                        if col == 'Formatted_Date':
-                            display_columns.append('Date')
-                            filtered_df['Date'] = filtered_df['Formatted_Date']
-                        else:
-                            display_columns.append(col)
-                
-                # Filter to available columns
-                available_display_columns = [col for col in display_columns if col in filtered_df.columns]
-                student_list = filtered_df[available_display_columns]
-                
-                # Add total count row
-                total_row = pd.DataFrame([['**TOTAL**'] + [''] * (len(available_display_columns) - 2) + [f'**{len(student_list)} Students**']], 
-                                       columns=available_display_columns)
-                display_list = pd.concat([student_list, total_row], ignore_index=True)
-                
-                st.dataframe(
-                    display_list,
-                    use_container_width=True,
-                    hide_index=True,
-                    height=400
-                )
-                
-                # Download button
-                csv_buffer = BytesIO()
-                student_list.to_csv(csv_buffer, index=False)
-                csv_buffer.seek(0)
-                
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=csv_buffer.getvalue(),
-                    file_name=f"student_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=False
-                )
-                
-            else:
-                st.warning("No students found with the selected filters.")
+            st.session_state.student_list = {
+                'selections': {
+                    'Year': list(st.session_state.selected_years),
+                    'Course': list(st.session_state.selected_courses),
+                    **extra_selections,
+                },
+                'date_range': date_range,
+            }
+            st.session_state.student_list_page = 1
         else:
+            st.session_state.pop('student_list', None)
             st.error("Please select at least one year and one course before generating the list.")
-
-def main():
-    """Main application function"""
-    # Header
-    st.markdown("""
-    <div class="main-header">
-        SMP Admission Analysis 2025-26
-    </div>
-    """, unsafe_allow_html=True)
     
-    # Load data
-    df = load_data()
-    
-    if df is None or df.empty:
-        st.error("No valid data found. Please ensure your CSV file is in the project directory and contains the required columns.")
-        return
-    
-    # Create tabs
-    tab1, tab2, tab3 = st.tabs(["📈 Year & Course Statistics", "📅 Date-wise Admissions", "👥 Student List"])
-    
-    with tab1:
+    if 'student_list' in st.session_state:
+        # The status view applies on top of the generated filters, from the index's Status rows
+        query = st.session_state.student_list
+        query = {**query, 'selections': {**query['selections'], **analytics.get_status_selections(status)}}
+        with diagnostics.stage('filter_query') as record:
+            total, build_rows = query_student_list(df, index, query)
+            record['rows'] = total
+        
+        if total:
+            show_student_page(build_rows, total)
+            show_export_buttons(df, build_rows, total, query)
+            
+        else:
+            st.warning("No students found with the selected filters.")
+
+def query_student_list(df, index, query):
+    """Return (row count, build_rows(start, stop)) of a Student List query
+    
+    With a store holding this roster version only the count runs now; pages
+    and exports fetch just their own rows. Otherwise, or once the warm-up has
+    written the next version's store, the in-memory filter index answers.
+    """
+    def query_index():
+        positions = analytics.query_filter_index(index, query['selections'], query['date_range'])
+        return len(positions), lambda start, stop: analytics.build_student_page(df, positions, start, stop)
+    
+    if not store.STORE_PATH:
+        return query_index()
+    
+    row_range = df.attrs.get('row_range')
+    version = get_store_version(df)
+    try:
+        total = store.count_students(store.STORE_PATH, query['selections'], query['date_range'], row_range, version)
+    except store.StaleStoreError:
+        return query_index()
+    
+    def build_rows(start, stop):
+        try:
+            return store.fetch_student_page(
+                store.STORE_PATH, query['selections'], query['date_range'], start, stop, row_range, version
+            )
+        except store.StaleStoreError:
+            return query_index()[1](start, stop)
+    
+    return total, build_rows
+
+# Each tab is a fragment: its widgets rerun only that tab, not the whole dashboard
+
+@st.fragment
+def statistics_tab(df, status):
+    """Year & Course Statistics tab"""
+    with diagnostics.stage('statistics_tab', session=get_session_id()):
+        cube = get_count_cube(df, status)
+        
         # Summary metrics
-        create_metric_cards(df)
+        create_metric_cards(cube)
+        if cube.empty:
+            st.info("No students in this view.")
+            return
         
         st.markdown('<div style="margin: 2rem 0;"></div>', unsafe_allow_html=True)
         
         # Course strength boxes
         st.markdown('<div class="section-separator">🎯 Course-wise Student Strength</div>', unsafe_allow_html=True)
-        create_course_strength_boxes(df)
+        create_course_strength_boxes(cube)
         
         st.markdown('<div style="margin: 2rem 0;"></div>', unsafe_allow_html=True)
         
         # Statistics table
-        create_year_course_stats_table(df)
+        create_year_course_stats_table(cube)
         
         st.markdown('<div style="margin: 2rem 0;"></div>', unsafe_allow_html=True)
         
         # Bar chart
         st.markdown('<div class="section-separator">📊 Course Distribution Chart</div>', unsafe_allow_html=True)
-        create_course_chart(df)
+        create_course_chart(cube)
+
+@st.fragment
+def datewise_tab(df, status):
+    """Date-wise Admissions tab"""
+    with diagnostics.stage('datewise_tab', session=get_session_id()):
+        cube = get_count_cube(df, status)
+        if cube.empty:
+            st.info("No students in this view.")
+            return
+        selected = select_date_range(cube) if 'Date' in cube.columns else cube
+        view = st.radio("View", ["Date-wise table", "Time series"], horizontal=True, key="datewise_view")
+        if view == "Time series":
+            create_time_series(cube, selected)
+        else:
+            create_datewise_stats(selected)
+
+@st.fragment
+def student_list_tab(df, status):
+    """Student List tab"""
+    with diagnostics.stage('student_list_tab', session=get_session_id()):
+        create_student_list_tab(df, status)
+
+def get_session_id():
+    """Short random id telling sessions apart in the diagnostics"""
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:8]
+    return st.session_state.session_id
+
+def show_diagnostics():
+    """Optional sidebar panel with the stage timings of this session's recent runs"""
+    if not st.sidebar.checkbox("Show diagnostics", key="show_diagnostics"):
+        return
+    
+    session_id = get_session_id()
+    runs = [run for run in diagnostics.get_recent_runs() if run['session'] == session_id][:5]
+    
+    rows = []
+    for run in runs:
+        for depth, record in diagnostics.flatten_run(run):
+            rows.append({
+                'Run': run['time'][11:19],
+                'Stage': '· ' * depth + record['stage'],
+                'ms': round(record['seconds'] * 1000, 1),
+                'Rows': record['rows'],
+                'Cache': record['cache'] or ''
+            })
+    
+    st.sidebar.markdown("### Diagnostics")
+    st.sidebar.dataframe(pd.DataFrame(rows).astype({'Rows': 'Int64'}), use_container_width=True, hide_index=True)
+    
+    slowest = max(diagnostics.get_recent_runs(), key=lambda run: run['seconds'], default=None)
+    if slowest is not None:
+        st.sidebar.caption(f"Slowest recent run (all sessions): {slowest['stage']} at {slowest['time'][11:19]}, {slowest['seconds'] * 1000:,.0f} ms")
+    if diagnostics.LOG_PATH:
+        st.sidebar.caption(f"Every run is logged to {diagnostics.LOG_PATH}")
+
+def render_dashboard():
+    """Render the header, data sources and the open tab"""
+    # Header
+    st.markdown("""
+    <div class="main-header">
+        SMP Admission Analysis 2025-26
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Load data, once the background warm-up has prepared it
+    wait_for_warmup()
+    df = load_data()
+    
+    if df is None or df.empty:
+        st.error("No valid data found. Please ensure your CSV or Excel file is in the project directory and contains the required columns.")
+        return
+    
+    show_source_info(df)
+    show_memory_report(df)
+    df = select_academic_year(df)
+    status = select_status()
+    
+    # Create tabs; only the open tab's body runs on each rerun
+    tab1, tab2, tab3 = st.tabs(
+        ["📈 Year & Course Statistics", "📅 Date-wise Admissions", "👥 Student List"],
+        key="active_tab",
+        on_change="rerun"
+    )
+    
+    with tab1:
+        if tab1.open:
+            statistics_tab(df, status)
     
     with tab2:
-        create_datewise_stats(df)
+        if tab2.open:
+            datewise_tab(df, status)
     
     with tab3:
-        create_student_list_tab(df)
+        if tab3.open:
+            student_list_tab(df, status)
+
+def main():
+    """Main application function"""
+    with diagnostics.stage('rerun', session=get_session_id()):
+        render_dashboard()
+    
+    # Shown after the run so its own timings are included
+    show_diagnostics()
 
 if __name__ == "__main__":
     main()
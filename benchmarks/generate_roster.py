@@ -0,0 +1,135 @@
+"""Generate a synthetic admission roster in the student_data.csv schema
+
+    python -m benchmarks.generate_roster --rows 1000000 --output synthetic.csv
+"""
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Rows generated and written per chunk, so 10M-row rosters don't need 10M rows in memory
+GENERATE_CHUNK_ROWS = 1000000
+
+# First receipt number; receipts increase with the admission date like the real register
+FIRST_RECEIPT = 5187
+
+# Value distributions, loosely following the 2025-26 register
+COURSES = {'CS': 0.32, 'ME': 0.29, 'EC': 0.24, 'CE': 0.15}
+YEARS = {'1st Yr': 0.7, '2nd Yr': 0.18, '3rd Yr': 0.12}
+CATEGORIES = {'GM': 0.45, '2A': 0.15, '2B': 0.05, '3A': 0.07, '3B': 0.1, 'SC': 0.12, 'ST': 0.04, 'C1': 0.02}
+ADMISSION_TYPES = {'REGULAR': 0.88, 'SNQ': 0.04, 'LATERAL': 0.08}
+OUT_SHARE = 0.03
+DUE_FEE_SHARE = 0.04
+
+# Admissions open mid-May and taper off over the season; nobody is admitted on Sundays
+SEASON_START = (5, 12)
+SEASON_DAYS = 150
+SEASON_DECAY_DAYS = 30
+
+FIRST_NAMES = [
+    'ABHISHEK', 'AKASH', 'ANUPAMA', 'BHUVAN', 'CHANDAN', 'DARSHAN', 'DEEPIKA', 'GAGAN', 'GIRISH',
+    'HARSHITHA', 'KAVYA', 'KIRAN', 'LIKITH', 'LOHITH', 'MADAN', 'MEGHANA', 'MONISHA', 'NANDAN',
+    'PAVAN', 'PRAJWAL', 'RAKSHITH', 'SAHANA', 'SHRUSTI', 'SUHAS', 'TEJAS', 'TULASI', 'VISHAK', 'YASHWANTH'
+]
+FATHER_NAMES = [
+    'BASAVARAJ', 'CHANDRAPPA', 'GANGADHAR', 'HANUMANTHAPPA', 'KRISHNAPPA', 'MANJUNATH',
+    'NAGARAJ', 'RAMESH', 'SHIVAKUMAR', 'SURESH', 'VENKATESH'
+]
+INITIALS = [f'{a} {b}' for a in 'ABGHKMNRSTV' for b in 'ABGHKMNRSTV']
+
+ROSTER_COLUMNS = [
+    'Sl No', 'Student Name', 'Father Name', 'Year', 'Course', 'Reg No', 'Cat', 'Adm Type', 'Adm Cat',
+    'Date', 'Rpt', 'Acdmc Year', 'In/Out', 'Remarks'
+]
+
+def choose(rng, distribution, size):
+    """Draw `size` values from a {value: probability} distribution"""
+    values = np.array(list(distribution), dtype=object)
+    weights = np.array(list(distribution.values()), dtype=float)
+    return values[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+def season_dates(academic_year):
+    """Admission dates of an academic year ('2025-26') and the share of admissions on each"""
+    start = date(int(academic_year[:4]), *SEASON_START)
+    days = [start + timedelta(days=i) for i in range(SEASON_DAYS)]
+    days = [day for day in days if day.weekday() != 6]
+    weights = np.exp(-np.arange(len(days)) / SEASON_DECAY_DAYS)
+    return days, weights / weights.sum()
+
+def generate_chunks(rows, academic_years=('2025-26',), seed=0, chunk_rows=GENERATE_CHUNK_ROWS):
+    """Yield roster frames with `rows` rows in total, spread evenly over the academic years
+
+    Rows are in admission order within each year: dates never decrease and
+    receipt numbers keep increasing across chunks.
+    """
+    rng = np.random.default_rng(seed)
+    receipt = FIRST_RECEIPT
+    serial = 1
+    per_year = np.diff(np.linspace(0, rows, len(academic_years) + 1).astype(int))
+
+    for academic_year, year_rows in zip(academic_years, per_year):
+        days, weights = season_dates(academic_year)
+        labels = np.array([day.strftime('%d-%b-%y') for day in days], dtype=object)
+        # Day of every admission, drawn up front as counts per day so chunks stay in date order
+        day_counts = rng.multinomial(year_rows, weights)
+        day_index = np.repeat(np.arange(len(days)), day_counts)
+
+        for start in range(0, year_rows, chunk_rows):
+            size = min(chunk_rows, year_rows - start)
+            admission_type = choose(rng, ADMISSION_TYPES, size)
+            year = choose(rng, YEARS, size)
+            # Lateral entries join the second year directly
+            year[admission_type == 'LATERAL'] = '2nd Yr'
+            category = choose(rng, CATEGORIES, size)
+            admission_category = category.copy()
+            admission_category[rng.random(size) < 0.1] = 'GM'
+
+            student_names = (
+                pd.Series(choose(rng, dict.fromkeys(FIRST_NAMES, 1), size)) + ' ' +
+                pd.Series(choose(rng, dict.fromkeys(INITIALS, 1), size))
+            )
+            out = rng.random(size) < OUT_SHARE
+            due_fee = rng.random(size) < DUE_FEE_SHARE
+
+            yield pd.DataFrame({
+                'Sl No': np.arange(serial, serial + size),
+                'Student Name': student_names.to_numpy(),
+                'Father Name': choose(rng, dict.fromkeys(FATHER_NAMES, 1), size),
+                'Year': year,
+                'Course': choose(rng, COURSES, size),
+                'Reg No': np.arange(start + 1, start + size + 1),
+                'Cat': category,
+                'Adm Type': admission_type,
+                'Adm Cat': admission_category,
+                'Date': labels[day_index[start:start + size]],
+                'Rpt': np.arange(receipt, receipt + size),
+                'Acdmc Year': academic_year,
+                'In/Out': np.where(out, 'Out', 'In'),
+                'Remarks': np.where(due_fee, 'Due Fee', ''),
+            }, columns=ROSTER_COLUMNS)
+            receipt += size
+            serial += size
+
+def write_roster(path, rows, academic_years=('2025-26',), seed=0):
+    """Write a synthetic roster CSV with `rows` rows to path"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for i, chunk in enumerate(generate_chunks(rows, academic_years, seed)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+    return path
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic admission roster CSV.")
+    parser.add_argument('--rows', type=int, default=100000, help="number of rows (default: 100000)")
+    # No default: a CSV left in the project folder would be picked up by the dashboard
+    parser.add_argument('--output', required=True, help="CSV file to write")
+    parser.add_argument('--academic-years', nargs='+', default=['2025-26'], help="academic years to spread the rows over")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args(argv)
+
+    write_roster(args.output, args.rows, args.academic_years, args.seed)
+    print(f"{args.output}: {args.rows} rows")
+
+if __name__ == "__main__":
+    main()
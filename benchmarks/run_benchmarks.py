@@ -0,0 +1,210 @@
+"""Time the loading, table, chart, filter and export paths on synthetic rosters
+
+    python -m benchmarks.run_benchmarks --sizes 10000 100000 1000000
+    python -m benchmarks.run_benchmarks --sizes 10000 --compare benchmarks/results/<earlier run>.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import data_loader
+import exports
+import store
+from benchmarks import generate_roster
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+RESULTS_FOLDER = os.path.join('benchmarks', 'results')
+
+# Rows shown on one Student List page
+PAGE_ROWS = 50
+
+# Admissions appended to the roster when timing the incremental count cube update
+APPENDED_ROWS = 500
+
+def measure(fn, repeat):
+    """Run fn `repeat` times; return (fastest time in seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def get_commit():
+    """Current git commit, or None outside a checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_cold(folder):
+    """Load a folder with no in-memory state and no snapshots"""
+    for snapshot in glob.glob(os.path.join(folder, '*' + data_loader.SNAPSHOT_SUFFIX)):
+        os.remove(snapshot)
+    data_loader.clear_state()
+    return data_loader.load_dataset(data_loader.get_fingerprints(data_loader.discover_source_files(folder)))
+
+def load_from_snapshot(folder):
+    """Load a folder with no in-memory state, reading the snapshots left by load_cold"""
+    data_loader.clear_state()
+    return data_loader.load_dataset(data_loader.get_fingerprints(data_loader.discover_source_files(folder)))
+
+def load_cached(folder):
+    """Load a folder whose files are already parsed in this process"""
+    return data_loader.load_dataset(data_loader.get_fingerprints(data_loader.discover_source_files(folder)))
+
+def benchmark_roster(folder, repeat):
+    """Time every stage on the roster in `folder`; returns (roster row count, {stage: seconds})"""
+    stages = {}
+    stages['load_cold'], df = measure(lambda: load_cold(folder), 1)
+    stages['load_snapshot'], df = measure(lambda: load_from_snapshot(folder), repeat)
+    stages['load_cached'], df = measure(lambda: load_cached(folder), repeat)
+
+    stages['count_cube'], full_cube = measure(lambda: analytics.build_count_cube(df), repeat)
+    # Refreshing the cube after a day's admissions were appended, instead of rebuilding it
+    base_cube = analytics.build_count_cube(df.iloc[:-APPENDED_ROWS])
+    stages['count_cube_append'], appended_cube = measure(
+        lambda: analytics.apply_cube_delta(base_cube, df.iloc[-APPENDED_ROWS:]), repeat
+    )
+    if not analytics.check_count_cube(appended_cube, df):
+        raise RuntimeError("The incrementally updated count cube differs from a full rebuild")
+    stages['status_cube'], cube = measure(lambda: analytics.filter_cube_by_status(full_cube, 'Admitted'), repeat)
+    # Extending the time series by the newest day, then checking trimmed and grown rosters against a full recompute
+    daily = analytics.build_daily_admissions(cube)
+    base_series = analytics.update_time_series(None, daily.iloc[:-1])
+    stages['time_series_append'], _ = measure(lambda: analytics.update_time_series(base_series, daily), repeat)
+    full_series = analytics.update_time_series(None, daily)
+    cases = [(full_series, daily.iloc[1:]), (full_series, daily.iloc[:-1]), (base_series, daily)]
+    for previous, changed in cases:
+        if not analytics.check_time_series(analytics.update_time_series(previous, changed), changed):
+            raise RuntimeError("The incrementally updated time series differ from a full recompute")
+    stages['year_course_table'], _ = measure(lambda: analytics.build_year_course_table(cube), repeat)
+    stages['datewise_table'], _ = measure(lambda: analytics.build_datewise_table(cube), repeat)
+    stages['course_chart_data'], _ = measure(lambda: analytics.rollup_cube(cube, ['Course', 'Year']), repeat)
+    stages['datewise_chart_data'], _ = measure(
+        lambda: analytics.build_datewise_counts(cube)['Date'].dt.strftime(analytics.DATE_LABEL_FORMAT),
+        repeat
+    )
+
+    stages['filter_index'], index = measure(lambda: analytics.build_filter_index(df), repeat)
+    # A typical Student List query: one course admitted during the first two weeks
+    dates = np.sort(df['Date'].dropna().unique())
+    date_range = (pd.Timestamp(dates[0]).date(), (pd.Timestamp(dates[0]) + pd.Timedelta(days=13)).date())
+    selections = {'Course': [index['columns']['Course']['values'][0]], **analytics.get_status_selections('Admitted')}
+    stages['filter_query'], positions = measure(
+        lambda: analytics.query_filter_index(index, selections, date_range), repeat
+    )
+    stages['student_page'], _ = measure(
+        lambda: analytics.build_student_page(df, positions, 0, min(PAGE_ROWS, len(positions))), repeat
+    )
+    stages['search_index'], search_index = measure(lambda: analytics.build_search_index(df), repeat)
+    # A partly typed name with a typo, as the search box sees it while the user types
+    stages['search_query'], _ = measure(lambda: analytics.search_students(search_index, 'abhisek k'), repeat)
+    for fmt in exports.EXPORT_FORMATS:
+        stages[f'export_{fmt}'], _ = measure(
+            lambda: exports.export_rows(
+                fmt, lambda start, stop: analytics.build_student_page(df, positions, start, stop), len(positions)
+            ),
+            repeat
+        )
+
+    # The same queries answered by the optional SQLite store
+    store_path = os.path.join(folder, 'roster.sqlite')
+    stages['store_write'], _ = measure(lambda: store.write_store(df, store_path), 1)
+    stages['store_count_cube'], _ = measure(lambda: store.build_count_cube(store_path), repeat)
+    stages['store_filter_query'], total = measure(
+        lambda: store.count_students(store_path, selections, date_range), repeat
+    )
+    stages['store_student_page'], _ = measure(
+        lambda: store.fetch_student_page(store_path, selections, date_range, 0, min(PAGE_ROWS, total)), repeat
+    )
+
+    stages['filtered_rows'] = len(positions)
+    return len(df), stages
+
+def run(sizes, repeat, seed, data_folder=None):
+    """Benchmark each roster size; returns the results document"""
+    results = []
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = tmp
+            if data_folder:
+                # Generated rosters are kept between runs, one folder per size and seed
+                folder = os.path.join(data_folder, f'roster_{rows}_{seed}')
+                os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, 'roster.csv')
+            if not os.path.exists(path):
+                generate_roster.write_roster(path, rows, seed=seed)
+
+            roster_rows, stages = benchmark_roster(folder, repeat)
+            results.append({'rows': rows, 'roster_rows': roster_rows, 'stages': stages})
+            print(f"{rows:>10} rows: " + ", ".join(
+                f"{stage} {seconds:.4f}s" for stage, seconds in stages.items() if stage != 'filtered_rows'
+            ))
+
+    return {
+        'commit': get_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'repeat': repeat,
+        'seed': seed,
+        'results': results,
+    }
+
+def compare(previous, current):
+    """Print the time ratio of every stage against an earlier results document"""
+    earlier = {result['rows']: result['stages'] for result in previous['results']}
+    print(f"Compared with {previous.get('commit')} ({previous.get('created')}); ratio > 1 is slower")
+    for result in current['results']:
+        before = earlier.get(result['rows'])
+        if before is None:
+            continue
+        for stage, seconds in result['stages'].items():
+            if stage == 'filtered_rows' or not before.get(stage):
+                continue
+            print(f"{result['rows']:>10} {stage:<20} {before[stage]:>10.4f}s -> {seconds:>10.4f}s  x{seconds / before[stage]:.2f}")
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard computations on synthetic rosters.")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help="roster sizes in rows")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per stage; the fastest is kept (default: 3)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the generated rosters (default: 0)")
+    parser.add_argument('--data-folder', help="keep generated rosters here and reuse them on later runs")
+    parser.add_argument('--output', help=f"results JSON file (default: a new file in {RESULTS_FOLDER})")
+    parser.add_argument('--compare', help="earlier results JSON file to compare against")
+    args = parser.parse_args(argv)
+
+    document = run(args.sizes, args.repeat, args.seed, args.data_folder)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(RESULTS_FOLDER, f"{stamp}_{document['commit'] or 'nogit'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), document)
+
+if __name__ == "__main__":
+    main()
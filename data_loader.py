@@ -0,0 +1,809 @@
+import glob
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlrd
+
+# Source files picked up from the project directory, one export per academic year / intake round
+SOURCE_PATTERNS = ['*.csv', '*.xlsx', '*.xlsm', '*.xls']
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+# Prefix of the lock files Excel leaves next to open workbooks
+EXCEL_LOCK_PREFIX = '~$'
+
+# A CSV or sheet is used when its header (one of a sheet's first rows) holds all of these column names
+REQUIRED_COLUMNS = ['Student Name', 'Year', 'Course', 'In/Out', 'Remarks']
+HEADER_SEARCH_ROWS = 10
+
+# Reason shown for source files that are skipped because they hold no roster
+NOT_A_ROSTER = f"no header with the columns {', '.join(REQUIRED_COLUMNS)}"
+
+# Workbook rows are streamed and preprocessed this many at a time
+EXCEL_CHUNK_ROWS = 5000
+
+# Receipt numbers identify an admission, so the same row exported to two files is counted once
+DEDUPLICATE_COLUMN = 'Rpt'
+
+# Encoding used when a CSV is not valid UTF-8 (latin-1 decodes any byte sequence)
+FALLBACK_ENCODING = 'latin-1'
+
+# Maximum number of undecodable locations kept for the encoding report
+MAX_ENCODING_ISSUES = 20
+
+# Undecodable bytes show up as lone surrogates after a 'surrogateescape' decode
+UNDECODABLE_BYTE = re.compile('[\udc80-\udcff]')
+
+# Chunk size used when hashing source files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Explicit format of the Date column, so parsing is vectorized instead of inferred per row
+DATE_FORMAT = os.environ.get('SMP_DATE_FORMAT', '%d-%b-%y')
+
+# Maximum number of unparseable dates kept for the date report
+MAX_DATE_ISSUES = 20
+
+# Source columns kept in memory; anything else (e.g. the exported 'Sl No') is never loaded
+ROSTER_COLUMNS = [
+    'Student Name', 'Father Name', 'Year', 'Course', 'Reg No', 'Cat', 'Adm Type', 'Adm Cat',
+    'Admn Year', 'Date', 'Rpt', 'Acdmc Year', 'In/Out', 'Remarks'
+]
+
+# Typed schema of the preprocessed roster: low-cardinality text as categories,
+# numbers as the smallest nullable integer type that holds them
+CATEGORY_COLUMNS = ['Year', 'Course', 'Cat', 'Adm Type', 'Adm Cat', 'Admn Year', 'Acdmc Year', 'In/Out', 'Remarks', 'Status']
+INTEGER_COLUMNS = ['Reg No', 'Rpt']
+INTEGER_DTYPES = ['Int8', 'Int16', 'Int32', 'Int64']
+
+# Status derived once per row at load time: admitted, admitted with fees due, or out (withdrawn)
+STATUS_COLUMN = 'Status'
+STATUS_ADMITTED = 'Admitted'
+STATUS_DUE_FEE = 'Due Fee'
+STATUS_OUT = 'Out'
+STATUSES = [STATUS_ADMITTED, STATUS_DUE_FEE, STATUS_OUT]
+
+# Columnar snapshot written next to each source file; bump the version when the schema changes
+SNAPSHOT_SUFFIX = '.snapshot.parquet'
+SNAPSHOT_VERSION = 7
+SNAPSHOT_METADATA_KEY = b'smp_load_state'
+
+# Entry keys that are rebuilt in memory rather than stored in the snapshot metadata
+DERIVED_KEYS = ('frame', 'partitions')
+
+# The combined roster is partitioned by academic year
+PARTITION_COLUMN = 'Acdmc Year'
+UNKNOWN_PARTITION = 'Unknown'
+
+# Files are only handed to a process pool when at least this many need parsing
+MIN_PARALLEL_FILES = 2
+
+# Sessions share one roster object; copy-on-write makes their edits copy instead of mutate it
+# (always on from pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Per-process loading state; imported modules survive Streamlit reruns
+_state_lock = threading.Lock()
+_load_state = {}
+_partition_cache = {}
+_combined_cache = {'generation': 0}
+
+def discover_source_files(folder='.'):
+    """Return every source file in `folder` matching SOURCE_PATTERNS"""
+    found = set()
+    for pattern in SOURCE_PATTERNS:
+        found.update(glob.glob(os.path.join(folder, pattern)))
+    return sorted(
+        os.path.relpath(path) for path in found
+        if not os.path.basename(path).startswith(EXCEL_LOCK_PREFIX)
+    )
+
+def is_excel_file(file_path):
+    """Whether a source file is an Excel workbook rather than a CSV"""
+    return file_path.lower().endswith(EXCEL_EXTENSIONS)
+
+def get_file_fingerprint(file_path):
+    """Return (size, mtime_ns) identifying the current version of a file"""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def get_fingerprints(file_paths):
+    """Return a hashable (path, size, mtime_ns) tuple for each file"""
+    return tuple((path, *get_file_fingerprint(path)) for path in file_paths)
+
+def hash_file_prefix(file_path, length):
+    """Hash the first `length` bytes of a file without parsing it"""
+    digest = hashlib.sha1()
+    remaining = length
+    with open(file_path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(HASH_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def detect_encoding(data, line_offset=0, byte_offset=0):
+    """Choose the encoding for raw CSV bytes in a single pass over them
+
+    Returns (encoding, issue_count, issues), where issues lists the file line and
+    byte offset of the first bytes that are not valid UTF-8.
+    """
+    if data.isascii():
+        return 'utf-8', 0, []
+
+    text = data.decode('utf-8', errors='surrogateescape')
+
+    # Walk the undecodable bytes once, translating character positions to lines and byte offsets
+    issues = []
+    issue_count = 0
+    line = line_offset + 1
+    offset = byte_offset
+    last_pos = 0
+    for match in UNDECODABLE_BYTE.finditer(text):
+        issue_count += 1
+        if len(issues) >= MAX_ENCODING_ISSUES:
+            continue
+        segment = text[last_pos:match.start()]
+        line += segment.count('\n')
+        offset += len(segment.encode('utf-8', errors='surrogateescape'))
+        last_pos = match.start()
+        issues.append({'line': line, 'byte_offset': offset})
+
+    if issue_count:
+        return FALLBACK_ENCODING, issue_count, issues
+
+    # Strip a leading byte order mark so it doesn't end up in the first column name
+    if data.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig', 0, []
+    return 'utf-8', 0, []
+
+def is_roster_column(name):
+    """Whether a source column is loaded (read_csv usecols callback)"""
+    return str(name).strip() in ROSTER_COLUMNS
+
+def downcast_integers(values):
+    """Convert values to the smallest nullable integer dtype that holds them"""
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.isna().all():
+        return numbers.astype(INTEGER_DTYPES[0])
+
+    low, high = numbers.min(), numbers.max()
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return numbers.astype(dtype)
+    return numbers.astype(INTEGER_DTYPES[-1])
+
+def apply_schema(df):
+    """Cast the preprocessed roster to its typed columnar schema"""
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = downcast_integers(df[col])
+    return df
+
+def parse_dates(values):
+    """Parse raw Date values with DATE_FORMAT
+
+    Returns (dates, issue_count, issues); issues lists the 1-based data row and
+    raw value of the first entries that did not match the format.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, 0, []
+
+    # Workbook cells are already datetimes; only text goes through the format
+    dates = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+
+    failed = dates.isna() & values.notna()
+    if not failed.any():
+        return dates, 0, []
+
+    failed_values = values[failed]
+    issues = [
+        {'row': int(row) + 1, 'value': str(value)}
+        for row, value in failed_values.head(MAX_DATE_ISSUES).items()
+    ]
+    return dates, int(failed.sum()), issues
+
+def derive_status(df):
+    """Status of every row from the In/Out and Remarks text, as a categorical"""
+    is_in = df['In/Out'].astype('string').str.strip().str.upper() == 'IN'
+    due_fee = df['Remarks'].astype('string').str.contains('Due Fee', na=False, case=False)
+    status = np.select(
+        [~is_in.fillna(False).to_numpy(dtype=bool), due_fee.to_numpy(dtype=bool)],
+        [STATUS_OUT, STATUS_DUE_FEE],
+        STATUS_ADMITTED
+    )
+    return pd.Categorical(status, categories=STATUSES)
+
+def preprocess_data(df):
+    """Derive each row's status and parse the date column
+
+    Every row is kept; the dashboard chooses admitted, due fee or out rows
+    through the Status column, so the text is only scanned here, once per load.
+    Returns (frame, date_issue_count, date_issues). Display labels such as
+    dd-mmm-yy dates are derived on demand by the views, not stored per row.
+    """
+    date_issue_count, date_issues = 0, []
+    columns = {STATUS_COLUMN: derive_status(df)}
+
+    if 'Date' in df.columns:
+        columns['Date'], date_issue_count, date_issues = parse_dates(df['Date'])
+
+    # assign() adds the derived columns without copying the source frame up front
+    return apply_schema(df.assign(**columns)), date_issue_count, date_issues
+
+def split_partitions(df):
+    """Split one source's rows into {academic year: frame}"""
+    if PARTITION_COLUMN not in df.columns:
+        return {UNKNOWN_PARTITION: df}
+
+    years = df[PARTITION_COLUMN].astype('object').fillna(UNKNOWN_PARTITION).str.strip()
+    return {year: rows for year, rows in df.groupby(years, sort=True)}
+
+def get_snapshot_path(file_path):
+    """Path of the columnar snapshot kept next to a source file"""
+    return file_path + SNAPSHOT_SUFFIX
+
+def read_snapshot(file_path):
+    """Rebuild a load state entry from the snapshot next to `file_path`, if usable"""
+    snapshot_path = get_snapshot_path(file_path)
+    if not os.path.exists(snapshot_path):
+        return None
+
+    try:
+        # Memory-map the file so only the columns actually touched are paged in
+        table = pq.read_table(snapshot_path, memory_map=True)
+        meta = json.loads((table.schema.metadata or {})[SNAPSHOT_METADATA_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        return None
+
+    if meta.pop('version', None) != SNAPSHOT_VERSION:
+        return None
+
+    return {**meta, 'frame': table.to_pandas()}
+
+def write_snapshot(file_path, entry):
+    """Persist a load state entry as a typed Parquet snapshot next to `file_path`"""
+    meta = {key: value for key, value in entry.items() if key not in DERIVED_KEYS}
+    meta['version'] = SNAPSHOT_VERSION
+
+    snapshot_path = get_snapshot_path(file_path)
+    tmp_path = snapshot_path + '.tmp'
+    try:
+        table = pa.Table.from_pandas(entry['frame'])
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            SNAPSHOT_METADATA_KEY: json.dumps(meta).encode('utf-8'),
+        })
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, snapshot_path)
+    except (OSError, pa.ArrowException):
+        # The snapshot is only an accelerator; a read-only folder or a column Arrow
+        # can't store just means slower cold starts
+        pass
+
+def skipped_entry(size, mtime_ns, file_format, reason):
+    """Load state entry of a source file that holds no roster, e.g. a downloaded Student List"""
+    return {
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'format': file_format,
+        'sheet': None,
+        'encoding': None,
+        'encoding_issue_count': 0,
+        'encoding_issues': [],
+        'date_format': DATE_FORMAT,
+        'date_issue_count': 0,
+        'date_issues': [],
+        'row_count': 0,
+        'skipped': reason,
+        'frame': None,
+    }
+
+def parse_csv(file_path, size, mtime_ns):
+    """Parse a whole CSV file and build a fresh load state entry"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+
+    # Detect the encoding up front so the file is parsed exactly once
+    encoding, issue_count, issues = detect_encoding(data)
+
+    # Appended rows still carry every source column, so remember the full header
+    try:
+        columns = pd.read_csv(BytesIO(data), encoding=encoding, nrows=0).columns.str.strip()
+    except pd.errors.EmptyDataError:
+        return skipped_entry(size, mtime_ns, 'csv', "the file is empty")
+    if not all(col in columns for col in REQUIRED_COLUMNS):
+        return skipped_entry(size, mtime_ns, 'csv', NOT_A_ROSTER)
+
+    df = pd.read_csv(BytesIO(data), encoding=encoding, usecols=is_roster_column)
+
+    # Standardize column names
+    df.columns = df.columns.str.strip()
+
+    frame, date_issue_count, date_issues = preprocess_data(df)
+
+    return {
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'format': 'csv',
+        'sheet': None,
+        'parsed_bytes': len(data),
+        'prefix_hash': hashlib.sha1(data).hexdigest(),
+        'ends_with_newline': data.endswith(b'\n'),
+        'line_count': data.count(b'\n'),
+        'encoding': encoding,
+        'encoding_issue_count': issue_count,
+        'encoding_issues': issues,
+        'columns': list(columns),
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+        'date_format': DATE_FORMAT,
+        'date_issue_count': date_issue_count,
+        'date_issues': date_issues,
+        'row_count': len(df),
+        'frame': frame,
+    }
+
+def find_header(rows):
+    """Return (row number, column names) of the header among the first sheet rows, or None"""
+    for row_number, row in enumerate(rows, start=1):
+        names = [str(value).strip() if value is not None else '' for value in row]
+        if all(col in names for col in REQUIRED_COLUMNS):
+            return row_number, names
+    return None
+
+def cell_to_text(value):
+    """A sheet cell of a text column as a string; whole numbers lose the '.0' Excel stores them with"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def preprocess_row_chunks(columns, rows):
+    """Build the preprocessed roster from an iterator of raw sheet rows
+
+    Rows are materialized EXCEL_CHUNK_ROWS at a time and preprocessed straight
+    away into compact typed frames, so the raw cell values held at once are
+    bounded by the chunk size.
+    Returns (frame, row_count, date_issue_count, date_issues).
+    """
+    width = len(columns)
+    columns = [name or f'Unnamed: {i}' for i, name in enumerate(columns)]
+    kept = [col for col in columns if col in ROSTER_COLUMNS]
+    # Sheets can mix numbers into text columns (e.g. Cat 1 among 'GM'); read them all as text, as a CSV is
+    text_columns = [col for col in kept if col not in INTEGER_COLUMNS and col != 'Date']
+
+    # Skip blank rows and pad/trim the rest to the header width
+    rows = (
+        tuple(row[:width]) + (None,) * (width - len(row))
+        for row in rows
+        if any(value is not None and value != '' for value in row)
+    )
+
+    parts = []
+    row_count = 0
+    date_issue_count = 0
+    date_issues = []
+    while True:
+        chunk = list(itertools.islice(rows, EXCEL_CHUNK_ROWS))
+        if not chunk and parts:
+            break
+
+        df = pd.DataFrame.from_records(chunk, columns=columns)[kept]
+        for col in text_columns:
+            df[col] = df[col].map(cell_to_text, na_action='ignore')
+        df = df.infer_objects()
+        df.index = pd.RangeIndex(row_count, row_count + len(df))
+        row_count += len(df)
+        frame, chunk_issue_count, chunk_issues = preprocess_data(df)
+        parts.append(frame)
+        date_issue_count += chunk_issue_count
+        date_issues = (date_issues + chunk_issues)[:MAX_DATE_ISSUES]
+
+        if len(chunk) < EXCEL_CHUNK_ROWS:
+            break
+
+    frame = apply_schema(pd.concat(parts)) if len(parts) > 1 else parts[0]
+    return frame, row_count, date_issue_count, date_issues
+
+def excel_entry(size, mtime_ns, sheet_name, columns, parsed):
+    """Build the load state entry of a parsed workbook from preprocess_row_chunks output"""
+    frame, row_count, date_issue_count, date_issues = parsed
+    return {
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'format': 'excel',
+        'sheet': sheet_name,
+        'encoding': None,
+        'encoding_issue_count': 0,
+        'encoding_issues': [],
+        'columns': columns,
+        'date_format': DATE_FORMAT,
+        'date_issue_count': date_issue_count,
+        'date_issues': date_issues,
+        'row_count': row_count,
+        'frame': frame,
+    }
+
+def parse_xlsx(file_path, size, mtime_ns):
+    """Stream the roster sheet of an .xlsx/.xlsm workbook"""
+    # Read-only mode streams rows from the zip instead of building the whole workbook in memory
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            header = find_header(sheet.iter_rows(max_row=HEADER_SEARCH_ROWS, values_only=True))
+            if header is None:
+                continue
+
+            header_row, columns = header
+            parsed = preprocess_row_chunks(
+                columns, sheet.iter_rows(min_row=header_row + 1, values_only=True)
+            )
+            return excel_entry(size, mtime_ns, sheet.title, columns, parsed)
+    finally:
+        workbook.close()
+
+    return skipped_entry(size, mtime_ns, 'excel', NOT_A_ROSTER)
+
+def parse_xls(file_path, size, mtime_ns):
+    """Read the roster sheet of a legacy .xls workbook, loading one sheet at a time"""
+    workbook = xlrd.open_workbook(file_path, on_demand=True)
+
+    def row_values(row):
+        values = []
+        for cell in row:
+            if cell.ctype == xlrd.XL_CELL_DATE:
+                values.append(xlrd.xldate.xldate_as_datetime(cell.value, workbook.datemode))
+            elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+                values.append(None)
+            else:
+                values.append(cell.value)
+        return values
+
+    try:
+        for sheet_index in range(workbook.nsheets):
+            sheet = workbook.sheet_by_index(sheet_index)
+            header = find_header(row_values(row) for row in itertools.islice(sheet.get_rows(), HEADER_SEARCH_ROWS))
+            if header is None:
+                workbook.unload_sheet(sheet_index)
+                continue
+
+            header_row, columns = header
+            rows = (row_values(row) for row in itertools.islice(sheet.get_rows(), header_row, None))
+            parsed = preprocess_row_chunks(columns, rows)
+            return excel_entry(size, mtime_ns, sheet.name, columns, parsed)
+    finally:
+        workbook.release_resources()
+
+    return skipped_entry(size, mtime_ns, 'excel', NOT_A_ROSTER)
+
+def parse_full(file_path, size, mtime_ns):
+    """Parse a whole source file, CSV or Excel, into a fresh load state entry"""
+    if file_path.lower().endswith('.xls'):
+        return parse_xls(file_path, size, mtime_ns)
+    if is_excel_file(file_path):
+        return parse_xlsx(file_path, size, mtime_ns)
+    return parse_csv(file_path, size, mtime_ns)
+
+def parse_appended(file_path, meta, size, mtime_ns):
+    """Parse only the rows appended since `meta`
+
+    Returns (updated meta, preprocessed new rows), or None when the new rows
+    don't fit the cached schema and the file needs a full reload.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(meta['parsed_bytes'])
+        tail = f.read(size - meta['parsed_bytes'])
+
+    encoding, issue_count, issues = detect_encoding(tail, meta['line_count'], meta['parsed_bytes'])
+    if issue_count and meta['encoding'] != FALLBACK_ENCODING:
+        # New rows aren't valid UTF-8: the whole file has to be decoded with the fallback
+        return None
+
+    try:
+        new_rows = pd.read_csv(
+            BytesIO(tail),
+            header=None,
+            names=meta['columns'],
+            usecols=list(meta['dtypes']),
+            dtype=meta['dtypes'],
+            encoding=meta['encoding']
+        )
+    except (ValueError, UnicodeDecodeError, pd.errors.ParserError):
+        return None
+
+    new_rows.index = pd.RangeIndex(meta['row_count'], meta['row_count'] + len(new_rows))
+    frame, date_issue_count, date_issues = preprocess_data(new_rows)
+
+    updated = {
+        **meta,
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'parsed_bytes': size,
+        'prefix_hash': hash_file_prefix(file_path, size),
+        'ends_with_newline': tail.endswith(b'\n'),
+        'line_count': meta['line_count'] + tail.count(b'\n'),
+        'encoding_issue_count': meta['encoding_issue_count'] + issue_count,
+        'encoding_issues': (meta['encoding_issues'] + issues)[:MAX_ENCODING_ISSUES],
+        'date_issue_count': meta['date_issue_count'] + date_issue_count,
+        'date_issues': (meta['date_issues'] + date_issues)[:MAX_DATE_ISSUES],
+        'row_count': meta['row_count'] + len(new_rows),
+    }
+    return updated, frame
+
+def plan_refresh(file_path, size, mtime_ns, entry):
+    """Decide how much of a source file has to be parsed again
+
+    Returns 'unchanged', 'touched', 'append' or 'full'.
+    """
+    if entry is None:
+        return 'full'
+
+    if entry['date_format'] != DATE_FORMAT:
+        # Dates were parsed with a different format
+        return 'full'
+
+    if (entry['size'], entry['mtime_ns']) == (size, mtime_ns):
+        return 'unchanged'
+
+    if entry['format'] != 'csv' or entry.get('skipped'):
+        # Workbooks are zip/OLE containers and skipped files kept no rows, so any change means reading them again
+        return 'full'
+
+    unchanged_prefix = (
+        size >= entry['parsed_bytes'] and
+        hash_file_prefix(file_path, entry['parsed_bytes']) == entry['prefix_hash']
+    )
+
+    if unchanged_prefix and size == entry['parsed_bytes']:
+        return 'touched'
+
+    if unchanged_prefix and entry['ends_with_newline']:
+        return 'append'
+
+    # An existing row changed: parse the whole file again
+    return 'full'
+
+def run_parse_jobs(jobs):
+    """Run parse jobs, on a process pool when several files need parsing"""
+    if len(jobs) < MIN_PARALLEL_FILES:
+        return {path: func(*args) for path, (func, args) in jobs.items()}
+
+    # Loads run on the warm-up and API threads, and forking a multi-threaded process can deadlock the child
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1), mp_context=context) as pool:
+        futures = {path: pool.submit(func, *args) for path, (func, args) in jobs.items()}
+        return {path: future.result() for path, future in futures.items()}
+
+def refresh_sources(fingerprints):
+    """Bring the load state entry of every source file up to date
+
+    Unchanged files cost a stat, appended files parse only their new rows and
+    everything else is reparsed, in parallel when more than one file changed.
+    Returns (entries, {file path: number of rows appended to it}).
+    """
+    entries = {}
+    appended = {}
+    jobs = {}
+    versions = {file_path: (size, mtime_ns) for file_path, size, mtime_ns in fingerprints}
+
+    for file_path, size, mtime_ns in fingerprints:
+        entry = _load_state.get(file_path)
+        if entry is None:
+            # Cold start: resume from the columnar snapshot instead of re-parsing the CSV
+            entry = read_snapshot(file_path)
+
+        plan = plan_refresh(file_path, size, mtime_ns, entry)
+        if plan == 'unchanged':
+            entries[file_path] = entry
+        elif plan == 'touched':
+            # Same content: record the new mtime, so later cold starts don't hash the whole file again
+            entries[file_path] = {**entry, 'mtime_ns': mtime_ns}
+            write_snapshot(file_path, entries[file_path])
+        elif plan == 'append':
+            meta = {key: value for key, value in entry.items() if key not in DERIVED_KEYS}
+            jobs[file_path] = (parse_appended, (file_path, meta, size, mtime_ns))
+            entries[file_path] = entry
+        else:
+            jobs[file_path] = (parse_full, (file_path, size, mtime_ns))
+
+    for file_path, result in run_parse_jobs(jobs).items():
+        if isinstance(result, dict):
+            entry = result
+        elif result is not None:
+            # Merge the appended rows into the cached frame
+            meta, new_rows = result
+            previous = entries[file_path]['frame']
+            entry = {**meta, 'frame': apply_schema(pd.concat([previous, new_rows]))}
+            appended[file_path] = len(new_rows)
+        else:
+            # The appended rows didn't fit the cached schema
+            entry = parse_full(file_path, *versions[file_path])
+
+        if not entry.get('skipped'):
+            write_snapshot(file_path, entry)
+        entries[file_path] = entry
+
+    for file_path, entry in entries.items():
+        if 'partitions' not in entry:
+            entry['partitions'] = split_partitions(entry['frame']) if entry['frame'] is not None else {}
+
+    # Forget files that were removed from the folder
+    _load_state.clear()
+    _load_state.update(entries)
+    return entries, appended
+
+def deduplicate_rows(df):
+    """Drop rows whose receipt number appears again later in the frame"""
+    if DEDUPLICATE_COLUMN not in df.columns:
+        return df
+
+    receipts = df[DEDUPLICATE_COLUMN]
+    return df[~(receipts.duplicated(keep='last') & receipts.notna())]
+
+def build_partition(parts):
+    """One academic year's rows from its (key, rows) parts, oldest file first"""
+    if len(parts) == 1:
+        return parts[0][1]
+    return apply_schema(deduplicate_rows(pd.concat([rows for _, rows in parts], ignore_index=True)))
+
+def append_to_partition(parts, cached, entries, appended):
+    """The cached partition extended by appended rows, or None when it has to be rebuilt
+
+    That is the case when the same files feed the partition as before and only
+    the newest of them changed, by appended rows whose receipt numbers are new
+    to the partition. Those rows then belong at its end, just as a rebuild
+    would place them.
+    """
+    (file_path, _, _), rows = parts[-1]
+    if file_path not in appended:
+        return None
+    if cached is None:
+        # A year first seen in the appended rows
+        return rows if len(parts) == 1 else None
+
+    old_keys, old_frame = cached
+    keys = tuple(part_key for part_key, _ in parts)
+    if len(old_keys) != len(keys) or old_keys[:-1] != keys[:-1] or old_keys[-1][0] != file_path:
+        return None
+    if len(parts) == 1:
+        return rows
+
+    # Rows keep their position in the file as index, so the appended ones are the last row numbers
+    new_rows = deduplicate_rows(rows[rows.index >= entries[file_path]['row_count'] - appended[file_path]])
+    if DEDUPLICATE_COLUMN in new_rows.columns and new_rows[DEDUPLICATE_COLUMN].isin(old_frame[DEDUPLICATE_COLUMN].dropna()).any():
+        # A new row replaces an older file's row with the same receipt number
+        return None
+    return apply_schema(pd.concat([old_frame, new_rows], ignore_index=True))
+
+def combine_partitions(entries, appended=None):
+    """Concatenate every source into one roster ordered by academic year
+
+    Each academic year partition is cached under the fingerprints of the files
+    contributing to it, so a change to one year's export leaves the others alone.
+    When several files feed a year, their rows follow each other from the least
+    to the most recently modified file, and the most recent one wins for rows
+    sharing a receipt number.
+
+    When the roster only grew by rows appended to its files, attrs['delta']
+    names the previous version and where the new rows are, so aggregates can
+    be updated from those rows instead of rebuilt.
+    """
+    appended = appended or {}
+    base = _combined_cache.get('frame')
+    # {year: (rows before, rows now)} while every change so far is an append
+    grown = {} if base is not None else None
+
+    contributors = {}
+    for file_path in sorted(entries, key=lambda path: entries[path]['mtime_ns']):
+        entry = entries[file_path]
+        for year, rows in entry['partitions'].items():
+            # CSVs are keyed on their content hash, so touching a file without changing it keeps the version
+            key = (file_path, entry['size'], entry.get('prefix_hash') or entry['mtime_ns'])
+            contributors.setdefault(year, []).append((key, rows))
+
+    partition_keys = {}
+    for year, parts in contributors.items():
+        key = tuple(part_key for part_key, _ in parts)
+        cached = _partition_cache.get(year)
+        if cached is None or cached[0] != key:
+            frame = append_to_partition(parts, cached, entries, appended) if grown is not None else None
+            if frame is None:
+                grown = None
+                frame = build_partition(parts)
+            else:
+                grown[year] = (len(cached[1]) if cached is not None else 0, len(frame))
+            _partition_cache[year] = (key, frame)
+        partition_keys[year] = key
+
+    for year in list(_partition_cache):
+        if year not in contributors:
+            del _partition_cache[year]
+            grown = None
+
+    if not contributors:
+        skipped = '; '.join(f"{file_path}: {entry['skipped']}" for file_path, entry in entries.items() if entry.get('skipped'))
+        raise ValueError(f"No roster found in the source files: {skipped}")
+
+    sources = [
+        {
+            'file': file_path,
+            'format': entry['format'],
+            'sheet': entry['sheet'],
+            'encoding': entry['encoding'],
+            'encoding_issue_count': entry['encoding_issue_count'],
+            'encoding_issues': entry['encoding_issues'],
+            'date_issue_count': entry['date_issue_count'],
+            'date_issues': entry['date_issues'],
+            'skipped': entry.get('skipped'),
+        }
+        for file_path, entry in sorted(entries.items())
+    ]
+
+    combined_key = tuple(sorted(partition_keys.items()))
+    if _combined_cache.get('key') == combined_key:
+        cached = _combined_cache['frame']
+        if cached.attrs['sources'] != sources:
+            # Only files holding no roster came or went: same rows, so same version, on a new frame
+            cached = cached.copy(deep=False)
+            cached.attrs['sources'] = sources
+            cached.attrs.pop('delta', None)
+            _combined_cache['frame'] = cached
+        return cached
+
+    years = sorted(partition_keys)
+    frames = [_partition_cache[year][1] for year in years]
+    combined = apply_schema(pd.concat(frames, ignore_index=True)) if len(frames) > 1 else frames[0].reset_index(drop=True)
+
+    # Row ranges of each partition, so a single academic year can be sliced without scanning
+    bounds = {}
+    start = 0
+    for year, frame in zip(years, frames):
+        bounds[year] = [start, start + len(frame)]
+        start += len(frame)
+
+    # Identifies this exact combination of source versions for downstream caches
+    combined.attrs['version'] = hashlib.sha1(repr(combined_key).encode('utf-8')).hexdigest()[:16]
+    # Counts the rosters built by this process, so a reload is visible at a glance
+    combined.attrs['generation'] = _combined_cache['generation'] + 1
+    combined.attrs['partitions'] = bounds
+    if grown is not None:
+        combined.attrs['delta'] = {
+            'base': base.attrs['version'],
+            'rows': {year: [bounds[year][0] + old, bounds[year][0] + new] for year, (old, new) in grown.items()},
+        }
+    combined.attrs['sources'] = sources
+
+    _combined_cache['key'] = combined_key
+    _combined_cache['frame'] = combined
+    _combined_cache['generation'] = combined.attrs['generation']
+    return combined
+
+def load_dataset(fingerprints):
+    """Return the combined roster for the given (path, size, mtime_ns) fingerprints"""
+    with _state_lock:
+        entries, appended = refresh_sources(fingerprints)
+        return combine_partitions(entries, appended)
+
+def clear_state():
+    """Forget every parsed file, so the next load_dataset starts from the snapshots"""
+    with _state_lock:
+        _load_state.clear()
+        _partition_cache.clear()
+        _combined_cache.pop('key', None)
+        _combined_cache.pop('frame', None)
@@ -0,0 +1,122 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# JSON-lines log of every timed run; set SMP_DIAGNOSTICS_LOG to an empty string to turn it off
+LOG_PATH = os.environ.get('SMP_DIAGNOSTICS_LOG', 'diagnostics.jsonl')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+
+# Completed runs kept in memory for the diagnostics panel, across all sessions
+RECENT_RUNS = 50
+
+_logger = logging.getLogger('smp.diagnostics')
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+_log_lock = threading.Lock()
+
+# Stages open on the current thread; Streamlit runs each rerun on its own script thread
+_local = threading.local()
+_recent_runs = deque(maxlen=RECENT_RUNS)
+
+def get_log_handler():
+    """Attach the rotating log file on first use, so importing this module creates no file"""
+    with _log_lock:
+        if not _logger.handlers and LOG_PATH:
+            handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _logger.addHandler(handler)
+    return _logger.handlers
+
+def write_run(run):
+    """Keep a completed run for the panel and append it to the log"""
+    _recent_runs.append(run)
+    try:
+        if get_log_handler():
+            _logger.info(json.dumps(run, default=str))
+    except OSError:
+        # Diagnostics must never break the dashboard, e.g. in a read-only folder
+        pass
+
+@contextmanager
+def stage(name, cached=False, session=None):
+    """Time a named stage; yields its record so the caller can fill in 'rows'
+
+    The outermost stage on a thread is a run: when it ends, it is written to the
+    log with every stage nested in it. `cached` marks stages backed by a cache;
+    they count as hits unless mark_cache_miss() is called while they're open.
+    """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+
+    record = {'stage': name, 'seconds': None, 'rows': None, 'cache': 'hit' if cached else None, 'stages': []}
+    if stack:
+        stack[-1]['stages'].append(record)
+    else:
+        record['time'] = datetime.now().isoformat(timespec='milliseconds')
+        record['session'] = session
+
+    stack.append(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = round(time.perf_counter() - started, 6)
+        stack.pop()
+        if not stack:
+            write_run(record)
+
+def timed(name, cached=False):
+    """Decorator running a function as a stage
+
+    Rows default to the length of the first argument (the frame it works on),
+    or of the result when it is called without arguments.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name, cached) as record:
+                result = fn(*args, **kwargs)
+                if record['rows'] is None:
+                    source = args[0] if args else result
+                    if hasattr(source, '__len__'):
+                        record['rows'] = len(source)
+                return result
+        return wrapper
+    return decorator
+
+def mark_cache_miss():
+    """Record that the innermost cached stage had to compute its result"""
+    for record in reversed(getattr(_local, 'stack', None) or []):
+        if record['cache'] is not None:
+            record['cache'] = 'miss'
+            return
+
+def set_rows(rows):
+    """Set the row count of the innermost open stage"""
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1]['rows'] = rows
+
+def flatten_run(run):
+    """List a run's stages depth-first as (depth, record) pairs"""
+    rows = []
+    pending = [(0, run)]
+    while pending:
+        depth, record = pending.pop()
+        rows.append((depth, record))
+        pending.extend((depth + 1, child) for child in reversed(record['stages']))
+    return rows
+
+def get_recent_runs(limit=None):
+    """Most recent completed runs, newest first"""
+    runs = list(_recent_runs)[::-1]
+    return runs[:limit] if limit else runs
@@ -0,0 +1,89 @@
+from io import BytesIO
+
+import openpyxl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Rows materialized per chunk while writing an export
+EXPORT_CHUNK_ROWS = 10000
+
+# Download formats: label, file extension and MIME type
+EXPORT_FORMATS = {
+    'csv': ('CSV', 'csv', 'text/csv'),
+    'xlsx': ('Excel', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('Parquet', 'parquet', 'application/vnd.apache.parquet'),
+}
+
+def iter_chunks(build_rows, total, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield build_rows(start, stop) frames covering rows [0, total)"""
+    for start in range(0, total, chunk_rows):
+        yield build_rows(start, min(start + chunk_rows, total))
+
+def write_csv(chunks):
+    """Write frames as one CSV document"""
+    buffer = BytesIO()
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(buffer, index=False, header=(i == 0))
+    return buffer.getvalue()
+
+def write_xlsx(chunks, sheet_name='Student List'):
+    """Write frames to a single-sheet workbook using openpyxl's write-only mode"""
+    # Write-only mode streams rows out instead of keeping every cell object in memory
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    for i, chunk in enumerate(chunks):
+        if i == 0:
+            sheet.append(list(chunk.columns))
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            sheet.append(row)
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def write_parquet(chunks):
+    """Write frames as one Parquet file, one row group per chunk"""
+    buffer = BytesIO()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, table.schema)
+        else:
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+    return buffer.getvalue()
+
+def write_json(chunks):
+    """Write frames as one JSON array of row objects"""
+    buffer = BytesIO()
+    buffer.write(b'[')
+    first = True
+    for chunk in chunks:
+        # Each chunk encodes as '[...]'; keep the rows and join them into a single array
+        rows = chunk.to_json(orient='records', date_format='iso')[1:-1]
+        if not rows:
+            continue
+        if not first:
+            buffer.write(b',')
+        buffer.write(rows.encode('utf-8'))
+        first = False
+    buffer.write(b']')
+    return buffer.getvalue()
+
+WRITERS = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+    'parquet': write_parquet,
+    'json': write_json,
+}
+
+def export_rows(fmt, build_rows, total):
+    """Export rows [0, total) produced by build_rows(start, stop) in the given format
+
+    Rows are materialized EXPORT_CHUNK_ROWS at a time, so working memory is
+    bounded by the chunk size on top of the encoded output.
+    """
+    return WRITERS[fmt](iter_chunks(build_rows, total))
@@ -0,0 +1,152 @@
+"""Write the dashboard reports without starting Streamlit
+
+    python report.py --output reports --format csv xlsx json
+    python report.py --academic-year 2025-26 --course CS ME --dates 2025-05-12 2025-05-31
+    python report.py --store roster.sqlite --status "Due Fee"
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import analytics
+import data_loader
+import exports
+import store
+
+# Formats the reports can be written in
+REPORT_FORMATS = ['csv', 'xlsx', 'json']
+
+# Report file names and their sheet titles
+REPORT_TITLES = {
+    'year_course': 'Year & Course',
+    'datewise': 'Date-wise',
+    'student_list': 'Student List',
+}
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Write the Year & Course, Date-wise and Student List reports.")
+    parser.add_argument('--folder', default='.', help="folder holding the CSV/Excel exports (default: current folder)")
+    parser.add_argument('--output', default='reports', help="folder the reports are written to (default: reports)")
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=REPORT_FORMATS, dest='formats',
+                        help="report formats (default: all)")
+    parser.add_argument('--academic-year', help="only report this academic year, e.g. 2025-26")
+    parser.add_argument('--status', choices=list(analytics.STATUS_VIEWS), default='Admitted',
+                        help="students to count (default: Admitted)")
+    parser.add_argument('--year', nargs='+', help="Student List: only these years, e.g. '1st Yr'")
+    parser.add_argument('--course', nargs='+', help="Student List: only these courses")
+    parser.add_argument('--dates', nargs=2, type=date.fromisoformat, metavar=('START', 'END'),
+                        help="Date-wise and Student List: only admissions between these ISO dates")
+    parser.add_argument('--store', help="SQLite store to query; rewritten from the exports only when they changed")
+    return parser.parse_args(argv)
+
+def load_roster(folder, academic_year=None):
+    """Load the preprocessed roster, optionally narrowed to one academic year"""
+    source_files = data_loader.discover_source_files(folder)
+    if not source_files:
+        raise SystemExit(f"No CSV or Excel files found in {folder}")
+
+    df = data_loader.load_dataset(data_loader.get_fingerprints(source_files))
+    if academic_year is None:
+        return df
+
+    partitions = df.attrs.get('partitions', {})
+    if academic_year not in partitions:
+        raise SystemExit(f"Academic year {academic_year} not found; loaded: {', '.join(sorted(partitions))}")
+    return analytics.slice_academic_year(df, academic_year)
+
+def open_store(path, folder, academic_year=None):
+    """Bring the store at path up to date with the exports; returns (metadata, academic year row range)"""
+    source_files = data_loader.discover_source_files(folder)
+    if not source_files:
+        raise SystemExit(f"No CSV or Excel files found in {folder}")
+
+    fingerprints = data_loader.get_fingerprints(source_files)
+    meta = store.read_meta(path)
+    if not store.is_current(meta, fingerprints):
+        meta = store.sync_store(data_loader.load_dataset(fingerprints), path, fingerprints)
+
+    if academic_year is None:
+        return meta, None
+    partitions = meta['partitions']
+    if academic_year not in partitions:
+        raise SystemExit(f"Academic year {academic_year} not found; loaded: {', '.join(sorted(partitions))}")
+    return meta, tuple(partitions[academic_year])
+
+def write_report(path, fmt, chunks, title):
+    """Encode frames in one format and write them to path"""
+    if fmt == 'xlsx':
+        data = exports.write_xlsx(chunks, sheet_name=title)
+    else:
+        data = exports.WRITERS[fmt](chunks)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def get_selections(status, years=None, courses=None):
+    """Student List selections for the command line filters"""
+    selections = {col: values for col, values in (('Year', years), ('Course', courses)) if values}
+    selections.update(analytics.get_status_selections(status))
+    return selections
+
+def build_reports(df, status='Admitted', years=None, courses=None, dates=None):
+    """Return {report name: (row count, chunk factory)} for every report"""
+    selections = get_selections(status, years, courses)
+    positions = analytics.query_filter_index(analytics.build_filter_index(df), selections, dates)
+    return assemble_reports(
+        analytics.build_count_cube(df), status, dates, len(positions),
+        lambda start, stop: analytics.build_student_page(df, positions, start, stop)
+    )
+
+def build_store_reports(path, row_range=None, status='Admitted', years=None, courses=None, dates=None):
+    """build_reports answered by indexed queries on the SQLite store at path"""
+    selections = get_selections(status, years, courses)
+    return assemble_reports(
+        store.build_count_cube(path, row_range), status, dates,
+        store.count_students(path, selections, dates, row_range),
+        lambda start, stop: store.fetch_student_page(path, selections, dates, start, stop, row_range)
+    )
+
+def assemble_reports(cube, status, dates, student_count, build_rows):
+    """Reports from a count cube and a Student List row builder"""
+    cube = analytics.filter_cube_by_status(cube, status)
+    datewise_cube = analytics.slice_cube_by_date(cube, *dates) if dates else cube
+
+    reports = {}
+    if 'Year' in cube.columns and 'Course' in cube.columns:
+        year_course = analytics.build_year_course_table(cube, markup=False)
+        reports['year_course'] = (len(year_course), lambda: [year_course])
+    if 'Date' in cube.columns and 'Course' in cube.columns:
+        datewise = analytics.build_datewise_table(datewise_cube, markup=False)
+        reports['datewise'] = (len(datewise), lambda: [datewise])
+
+    reports['student_list'] = (student_count, lambda: exports.iter_chunks(build_rows, student_count))
+    return reports
+
+def main(argv=None):
+    """Load the roster once and write every report in every requested format"""
+    args = parse_args(argv)
+    started = time.perf_counter()
+
+    if args.store:
+        meta, row_range = open_store(args.store, args.folder, args.academic_year)
+        reports = build_store_reports(args.store, row_range, args.status, args.year, args.course, args.dates)
+        student_count = row_range[1] - row_range[0] if row_range else meta['rows']
+    else:
+        df = load_roster(args.folder, args.academic_year)
+        reports = build_reports(df, args.status, args.year, args.course, args.dates)
+        student_count = len(df)
+
+    os.makedirs(args.output, exist_ok=True)
+    for name, (row_count, chunks) in reports.items():
+        for fmt in args.formats:
+            path = os.path.join(args.output, f"{name}.{fmt}")
+            write_report(path, fmt, chunks(), REPORT_TITLES[name])
+            print(f"{path}: {row_count} rows")
+
+    print(f"{student_count} students, done in {time.perf_counter() - started:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""Optional SQLite copy of the roster, queried with indexed SQL instead of in-memory scans
+
+Set SMP_STORE to a file path (e.g. roster.sqlite) to have the dashboard keep
+the store in step with the source files and run its count cube and Student
+List queries against it. report.py --store reads the same file and only
+touches the CSV/Excel exports when they changed since the store was written.
+"""
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+
+import analytics
+
+# Store file used by the dashboard; unset or empty keeps every query in memory
+STORE_PATH = os.environ.get('SMP_STORE', '')
+
+# Bump when the table layout changes so older store files are rewritten
+STORE_VERSION = 1
+ROSTER_TABLE = 'roster'
+META_TABLE = 'meta'
+
+# Columns with their own index; the roster position is the primary key
+INDEXED_COLUMNS = ['Year', 'Course', 'Date', 'Cat', 'Rpt', 'Status']
+
+# Rows inserted per executemany batch while writing the store
+WRITE_CHUNK_ROWS = 50000
+
+# Dates are stored as ISO text so they sort and compare as dates
+STORE_DATE_FORMAT = '%Y-%m-%d'
+
+class StaleStoreError(Exception):
+    """The store holds another version of the roster than the one queried"""
+
+def quote(name):
+    """Quote a column name for SQL; roster columns contain spaces and slashes"""
+    return '"' + name.replace('"', '""') + '"'
+
+def connect(path):
+    """Open the store read-only; raises sqlite3.OperationalError when it doesn't exist"""
+    return sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+
+def load_meta(con):
+    """Return the metadata dict of an open store, or None when its layout is outdated"""
+    rows = con.execute(f"SELECT key, value FROM {META_TABLE}").fetchall()
+    meta = {key: json.loads(value) for key, value in rows}
+    if meta.get('store_version') != STORE_VERSION:
+        return None
+    return meta
+
+def read_meta(path):
+    """Return the store's metadata dict, or None when there is no usable store at path"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with closing(connect(path)) as con:
+            return load_meta(con)
+    except sqlite3.DatabaseError:
+        return None
+
+def connect_version(path, version=None):
+    """Open the store read-only and return (connection, meta)
+
+    With a version, raises StaleStoreError unless the store holds that roster
+    version, e.g. while the next version is written for a reload. The check
+    and the queries share the connection, so a store swapped in meanwhile
+    isn't read.
+    """
+    try:
+        con = connect(path)
+    except sqlite3.DatabaseError:
+        raise StaleStoreError(f"No store at {path}")
+    try:
+        meta = load_meta(con)
+    except sqlite3.DatabaseError:
+        con.close()
+        raise StaleStoreError(f"No usable store at {path}")
+    if meta is None or (version is not None and meta['version'] != version):
+        con.close()
+        raise StaleStoreError(f"The store at {path} doesn't hold roster version {version}")
+    return con, meta
+
+def get_column_type(dtype):
+    """SQLite type of a roster column"""
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    return 'TEXT'
+
+def to_store_rows(chunk, start):
+    """Rows of a roster chunk as (position, values...) tuples, with None for missing cells"""
+    chunk = chunk.astype({col: object for col in chunk.columns if isinstance(chunk[col].dtype, pd.CategoricalDtype)})
+    if 'Date' in chunk.columns:
+        chunk['Date'] = chunk['Date'].dt.strftime(STORE_DATE_FORMAT)
+    chunk = chunk.astype(object).where(chunk.notna(), None)
+    return ((start + i, *row) for i, row in enumerate(chunk.itertuples(index=False, name=None)))
+
+def write_store(df, path, fingerprints=()):
+    """Write the roster and its indexes to a new store file at path
+
+    The file is built next to the old one and swapped in at the end, so
+    queries running meanwhile keep reading the previous version.
+    """
+    columns = list(df.columns)
+    meta = {
+        'store_version': STORE_VERSION,
+        'version': df.attrs.get('version'),
+        'fingerprints': [list(fingerprint) for fingerprint in fingerprints],
+        'partitions': df.attrs.get('partitions', {}),
+        'columns': columns,
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+        'rows': len(df),
+    }
+
+    temp_path = path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    with closing(sqlite3.connect(temp_path)) as con:
+        # Nothing reads the temporary file, so journaling can be skipped while it's filled
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        definitions = ', '.join(f"{quote(col)} {get_column_type(df[col].dtype)}" for col in columns)
+        con.execute(f"CREATE TABLE {ROSTER_TABLE} (pos INTEGER PRIMARY KEY, {definitions})")
+        con.execute(f"CREATE TABLE {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+
+        insert = f"INSERT INTO {ROSTER_TABLE} VALUES ({', '.join(['?'] * (len(columns) + 1))})"
+        for start in range(0, len(df), WRITE_CHUNK_ROWS):
+            con.executemany(insert, to_store_rows(df.iloc[start:start + WRITE_CHUNK_ROWS], start))
+
+        # Indexes are built once after loading, which is faster than maintaining them per insert
+        for col in INDEXED_COLUMNS:
+            if col in columns:
+                con.execute(f"CREATE INDEX {quote('ix_' + col)} ON {ROSTER_TABLE} ({quote(col)})")
+        con.executemany(
+            f"INSERT INTO {META_TABLE} VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in meta.items()]
+        )
+        con.execute("ANALYZE")
+        con.commit()
+
+    os.replace(temp_path, path)
+    return meta
+
+def sync_store(df, path, fingerprints=()):
+    """Rewrite the store at path unless it already holds this version of the roster"""
+    meta = read_meta(path)
+    if meta is not None and meta['version'] == df.attrs.get('version'):
+        return meta
+    return write_store(df, path, fingerprints)
+
+def is_current(meta, fingerprints):
+    """Whether a store was written from exactly these source file versions"""
+    return meta is not None and meta['fingerprints'] == [list(fingerprint) for fingerprint in fingerprints]
+
+def build_where(selections, date_range=None, row_range=None):
+    """SQL WHERE clause and parameters for a Student List query
+
+    Arguments are the same as analytics.query_filter_index; row_range limits
+    the query to one academic year's [start, stop) roster positions.
+    """
+    clauses = []
+    params = []
+    for col, values in selections.items():
+        values = [str(value) for value in values]
+        if not values:
+            # Nothing selected matches no rows, as with the in-memory index
+            clauses.append("0")
+            continue
+        clauses.append(f"{quote(col)} IN ({', '.join(['?'] * len(values))})")
+        params.extend(values)
+
+    if date_range is not None:
+        start, end = date_range
+        clauses.append(f"{quote('Date')} >= ? AND {quote('Date')} <= ?")
+        params.extend([pd.Timestamp(start).strftime(STORE_DATE_FORMAT), pd.Timestamp(end).strftime(STORE_DATE_FORMAT)])
+
+    if row_range is not None:
+        clauses.append("pos >= ? AND pos < ?")
+        params.extend(row_range)
+
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def restore_dtypes(frame, meta):
+    """Cast a query result back to the roster's column types"""
+    dtypes = meta['dtypes']
+    for col in frame.columns:
+        dtype = dtypes.get(col)
+        if dtype is None:
+            continue
+        if col == 'Date':
+            frame[col] = pd.to_datetime(frame[col], format=STORE_DATE_FORMAT).astype(dtype)
+        elif dtype == 'category':
+            frame[col] = frame[col].astype('category')
+        elif dtype.startswith('Int'):
+            frame[col] = frame[col].astype(dtype)
+    return frame
+
+def build_count_cube(path, row_range=None, version=None):
+    """Count cube of analytics.build_count_cube, aggregated by SQLite instead of pandas"""
+    con, meta = connect_version(path, version)
+    dims = [col for col in analytics.CUBE_DIMENSIONS if col in meta['columns']]
+    where, params = build_where({}, row_range=row_range)
+    group = ', '.join(quote(col) for col in dims)
+    # Missing values sort last in every dimension, as they do in pandas
+    order_dims = (['Date'] if 'Date' in dims else []) + [col for col in dims if col != 'Date']
+    order = ', '.join(f"{quote(col)} IS NULL, {quote(col)}" for col in order_dims)
+
+    with closing(con):
+        cube = pd.read_sql_query(
+            f"SELECT {group}, COUNT(*) AS Students FROM {ROSTER_TABLE}{where} GROUP BY {group} ORDER BY {order}",
+            con,
+            params=params
+        )
+    cube = restore_dtypes(cube, meta)
+    cube['Students'] = cube['Students'].astype('int64')
+    return cube
+
+def count_students(path, selections, date_range=None, row_range=None, version=None):
+    """Number of roster rows matching a Student List query"""
+    where, params = build_where(selections, date_range, row_range)
+    con, _ = connect_version(path, version)
+    with closing(con):
+        return con.execute(f"SELECT COUNT(*) FROM {ROSTER_TABLE}{where}", params).fetchone()[0]
+
+def fetch_student_page(path, selections, date_range, start, stop, row_range=None, version=None):
+    """Rows [start, stop) of a Student List query, formatted like analytics.build_student_page"""
+    con, meta = connect_version(path, version)
+    columns = [col for col in analytics.STUDENT_LIST_COLUMNS if col in meta['columns']]
+    where, params = build_where(selections, date_range, row_range)
+
+    with closing(con):
+        page = pd.read_sql_query(
+            f"SELECT {', '.join(quote(col) for col in columns)} FROM {ROSTER_TABLE}{where} "
+            f"ORDER BY pos LIMIT ? OFFSET ?",
+            con,
+            params=params + [max(stop - start, 0), start]
+        )
+    return analytics.format_student_page(restore_dtypes(page, meta), start)